@@ -5,17 +5,31 @@ Converts claude-cognitive attention state to Gemini-compatible context
 """
 import json
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
 
-def load_attention_state():
-    """Load current attention state from claude-cognitive."""
-    state_files = [
-        Path(".claude/attn_state.json"),
-        Path.home() / ".claude/attn_state.json"
-    ]
+# state_store.py ships with the router scripts (installed or in this repo)
+for scripts_dir in (Path.home() / ".claude/scripts", Path(__file__).resolve().parents[2] / "scripts"):
+    if (scripts_dir / "state_store.py").exists():
+        sys.path.insert(0, str(scripts_dir))
+        break
 
-    for state_file in state_files:
+try:
+    from state_store import read_merged_state
+except ImportError:
+    read_merged_state = None
+
+def load_attention_state():
+    """Load current attention state from claude-cognitive (merged across instances)."""
+    for state_dir in (Path(".claude"), Path.home() / ".claude"):
+        # Per-instance state shards (router v2 with state_store), then legacy JSON
+        if read_merged_state is not None:
+            state = read_merged_state(state_dir)
+            if state is not None:
+                return state
+
+        state_file = state_dir / "attn_state.json"
         if state_file.exists():
             try:
                 with open(state_file) as f:
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Attention Engine - NumPy array-backed attention scores
+
+Files are interned to integer IDs with their per-file decay factors kept in
+an array across turns; lazy decay of the live set is one vectorized power,
+and top-K selection uses argpartition.
+
+The engine reads the plain {path: [score_at_touch, touched_turn]} mapping
+kept in the attention state and produces {path: score}, so the state is the
+same as on the pure-Python path. That mapping is converted to arrays (and
+back) every turn, which costs about what the vectorized math saves: the
+router uses the engine only when CONTEXT_ENGINE=numpy. NumPy is optional:
+callers check NUMPY_AVAILABLE and fall back. It is imported on the first
+AttentionEngine(), not with this module.
+"""
+
+import importlib.util
+from typing import Callable, Dict, List, Tuple
+
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+np = None   # numpy module, bound by _import_numpy()
+
+
+def _import_numpy() -> None:
+    """Bind the module-level np on first use (raises ImportError if broken)."""
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+
+class AttentionEngine:
+    """Vectorized scores over interned file IDs."""
+
+    def __init__(self, decay_for: Callable[[str], float]):
+        """
+        Args:
+            decay_for: maps a file path to its per-turn decay factor
+        """
+        _import_numpy()
+        self.decay_for = decay_for
+        self.files: List[str] = []
+        self.file_ids: Dict[str, int] = {}
+        self.scores = np.zeros(0, dtype=np.float64)
+        self.decay = np.zeros(0, dtype=np.float64)
+
+    # ------------------------------------------------------------------------
+    # Interning and state sync
+    # ------------------------------------------------------------------------
+
+    def _sync(self, paths: List[str]) -> None:
+        """Re-intern in state order, reusing known decay factors."""
+        if paths == self.files:
+            return
+        known = {p: self.decay[i] for p, i in self.file_ids.items()}
+        self.files = paths
+        self.file_ids = {p: i for i, p in enumerate(paths)}
+        self.decay = np.array(
+            [known[p] if p in known else self.decay_for(p) for p in paths], dtype=np.float64
+        )
+
+    def load(self, scores: Dict[str, float]) -> None:
+        """Replace engine scores with a {path: score} mapping (state["scores"])."""
+        self._sync(list(scores))
+        self.scores = np.fromiter(scores.values(), dtype=np.float64, count=len(self.files))
+
+    # ------------------------------------------------------------------------
+    # Dynamics
+    # ------------------------------------------------------------------------
+
+    def materialize(self, touch: Dict[str, List[float]], turn: int, prune_below: float) -> Dict[str, float]:
+        """
+        Effective scores, score_at_touch x decay^(turn - touched_turn), of all
+        touched files. Files decayed below prune_below are removed from touch.
+        """
+        paths = list(touch)
+        self._sync(paths)
+        stamps = np.array(list(touch.values()), dtype=np.float64).reshape(len(paths), 2)
+        scores = stamps[:, 0] * self.decay ** (turn - stamps[:, 1])
+
+        live = scores >= prune_below
+        if not live.all():
+            for i in np.flatnonzero(~live):
+                del touch[paths[i]]
+            self.decay = self.decay[live]
+            self.files = [paths[i] for i in np.flatnonzero(live)]
+            self.file_ids = {p: i for i, p in enumerate(self.files)}
+            scores = scores[live]
+
+        self.scores = scores
+        return dict(zip(self.files, scores.tolist()))
+
+    # ------------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------------
+
+    def ranked(self, min_score: float, limit: int = 0) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        Files with score >= min_score, highest first (ties keep state order),
+        optionally only the top `limit`.
+
+        Returns: ([(path, score), ...], number of files below min_score)
+        """
+        ids = np.flatnonzero(self.scores >= min_score)
+        below = len(self.scores) - len(ids)
+        if limit and len(ids) > limit:
+            below += len(ids) - limit
+            top = np.argpartition(-self.scores[ids], limit - 1)[:limit]
+            ids = np.sort(ids[top])
+        order = ids[np.argsort(-self.scores[ids], kind="stable")]
+        return [(self.files[i], float(self.scores[i])) for i in order], below
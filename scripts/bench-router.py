@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Context Router Benchmark
+Generates synthetic .claude trees and keywords.json configs, then measures
+the router at each corpus size.
+
+Phases measured per size and prompt length (short / medium / long):
+  update_attention       attention dynamics only
+  build_context_output   ranking, packing and doc reads
+  main                   full hook turn in-process (state load/save, history, logs)
+  hook_process           full hook as a subprocess (interpreter start, index load)
+
+Each phase reports p50/p95/p99/mean latency, peak traced memory (from a
+separate short pass under tracemalloc, so latencies are not distorted) and
+bytes read per call (/proc/self/io rchar, Linux only).
+
+Usage:
+  bench-router.py                              # Sizes 20,500,5000,50000
+  bench-router.py --sizes 20,500 --turns 30    # Quicker run
+  bench-router.py --out bench.json             # Save results
+  bench-router.py --baseline bench.json        # Compare p95 against a saved run
+
+All writes (state, history, logs) go to a temporary HOME and project tree.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from phase_timer import percentile
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROUTER_PATH = SCRIPTS_DIR / "context-router-v2.py"
+
+CATEGORIES = ["systems", "modules", "integrations", "docs"]
+PROMPT_WORDS = {"short": 8, "medium": 60, "long": 600}
+TOPIC_VOCABULARY = 400       # Shared topical keywords (each used by many docs)
+MEMORY_PASS_TURNS = 5        # Turns traced with tracemalloc per phase
+HOOK_PROCESS_TURNS = 10      # Subprocess runs per size and prompt length
+
+FILLER = (
+    "the a of to and in is for that with on as by this be are from at or an it "
+    "we can should will not have has use used using into when then also more"
+).split()
+
+
+# ============================================================================
+# SYNTHETIC CORPUS
+# ============================================================================
+
+def topic_word(i: int) -> str:
+    return f"topic{i:03d}"
+
+
+def generate_corpus(project: Path, n_docs: int, rng: random.Random) -> dict:
+    """
+    Write n_docs .md files under project/.claude plus keywords.json.
+
+    Each doc gets its own keyword, its file stem and 1-3 shared topic words;
+    co-activation links 0-4 docs, mostly within the same directory.
+    """
+    root = project / ".claude"
+    per_dir = 50
+    docs: List[str] = []
+    for i in range(n_docs):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        rel = f"{category}/group{i // (per_dir * len(CATEGORIES))}/doc{i}.md"
+        docs.append(rel)
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [f"# Doc {i}", "", f"Covers component{i} in the {category} layer."]
+        for _ in range(rng.randint(10, 120)):
+            lines.append(" ".join(rng.choice(FILLER) for _ in range(rng.randint(4, 14))))
+        path.write_text("\n".join(lines) + "\n")
+
+    keywords = {}
+    for i, rel in enumerate(docs):
+        topics = rng.sample(range(TOPIC_VOCABULARY), rng.randint(1, 3))
+        keywords[rel] = [f"component{i}", f"doc{i}"] + [topic_word(t) for t in topics]
+
+    co_activation = {}
+    edges = 0
+    for i, rel in enumerate(docs):
+        k = rng.randint(0, 4)
+        if not k:
+            continue
+        group = i - i % per_dir
+        targets = set()
+        for _ in range(k):
+            j = rng.randrange(group, min(group + per_dir, n_docs)) if rng.random() < 0.8 else rng.randrange(n_docs)
+            if j != i:
+                targets.add(docs[j])
+        if targets:
+            co_activation[rel] = sorted(targets)
+            edges += len(targets)
+
+    config = {"keywords": keywords, "co_activation": co_activation, "pinned": []}
+    (root / "keywords.json").write_text(json.dumps(config))
+    return {"docs": n_docs, "keywords": sum(len(v) for v in keywords.values()), "edges": edges}
+
+
+def generate_prompts(n_docs: int, words: int, count: int, rng: random.Random) -> List[str]:
+    """Prompts mixing filler, a few doc mentions and some topic words."""
+    prompts = []
+    for _ in range(count):
+        tokens = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(max(1, words // 30)):
+            tokens[rng.randrange(words)] = f"component{rng.randrange(n_docs)}"
+        for _ in range(max(1, words // 60)):
+            tokens[rng.randrange(words)] = topic_word(rng.randrange(TOPIC_VOCABULARY))
+        prompts.append(" ".join(tokens))
+    return prompts
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def read_bytes() -> Optional[int]:
+    """Bytes read by this process so far (Linux /proc/self/io rchar)."""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def summarize(samples_ns: List[int], peak_bytes: Optional[int], read_total: Optional[int]) -> dict:
+    ms = sorted(s / 1e6 for s in samples_ns)
+    return {
+        "n": len(ms),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "peak_kib": round(peak_bytes / 1024, 1) if peak_bytes is not None else None,
+        "read_bytes_per_call": round(read_total / len(ms)) if read_total is not None and ms else None,
+    }
+
+
+def load_router():
+    """Import a fresh router module (loads keywords.json from the cwd)."""
+    spec = importlib.util.spec_from_file_location("context_router_bench", ROUTER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stderr(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def run_phase(step, prompts: List[str]) -> dict:
+    """Time step(prompt) over all prompts, then trace memory over a few more."""
+    samples = []
+    before = read_bytes()
+    with contextlib.redirect_stderr(io.StringIO()):
+        for prompt in prompts:
+            start = time.perf_counter_ns()
+            step(prompt)
+            samples.append(time.perf_counter_ns() - start)
+    after = read_bytes()
+    read_total = after - before if before is not None and after is not None else None
+
+    tracemalloc.start()
+    with contextlib.redirect_stderr(io.StringIO()):
+        for prompt in prompts[:MEMORY_PASS_TURNS]:
+            step(prompt)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return summarize(samples, peak, read_total)
+
+
+def bench_size(n_docs: int, turns: int, work_dir: Path, rng: random.Random) -> dict:
+    project = work_dir / f"project-{n_docs}"
+    project.mkdir()
+    start = time.perf_counter()
+    corpus = generate_corpus(project, n_docs, rng)
+    corpus["generate_s"] = round(time.perf_counter() - start, 2)
+
+    prev_cwd = os.getcwd()
+    os.chdir(project)
+    try:
+        start = time.perf_counter_ns()
+        load_router()                     # Builds and caches the keyword index
+        corpus["import_cold_ms"] = round((time.perf_counter_ns() - start) / 1e6, 1)
+        start = time.perf_counter_ns()
+        router = load_router()            # Loads the cached index
+        corpus["import_cached_ms"] = round((time.perf_counter_ns() - start) / 1e6, 1)
+
+        docs_root = project / ".claude"
+        phases: Dict[str, dict] = {}
+        for length, words in PROMPT_WORDS.items():
+            prompts = generate_prompts(n_docs, words, turns, rng)
+            state = {"touch": {}, "scores": {}, "turn_count": 0}
+
+            def attention_step(prompt):
+                router.update_attention(state, prompt)
+
+            def output_step(prompt):
+                router.update_attention(state, prompt)
+                start_ns = time.perf_counter_ns()
+                router.build_context_output(state, docs_root)
+                output_step.ns.append(time.perf_counter_ns() - start_ns)
+
+            def main_step(prompt):
+                stdin, stdout = sys.stdin, sys.stdout
+                sys.stdin, sys.stdout = io.StringIO(json.dumps({"prompt": prompt})), io.StringIO()
+                try:
+                    router.main()
+                finally:
+                    sys.stdin, sys.stdout = stdin, stdout
+
+            phases[f"update_attention/{length}"] = run_phase(attention_step, prompts)
+
+            # build_context_output is timed alone; the attention update only sets up its input
+            output_step.ns = []
+            before = read_bytes()
+            with contextlib.redirect_stderr(io.StringIO()):
+                for prompt in prompts:
+                    output_step(prompt)
+            after = read_bytes()
+            tracemalloc.start()
+            with contextlib.redirect_stderr(io.StringIO()):
+                for prompt in prompts[:MEMORY_PASS_TURNS]:
+                    router.update_attention(state, prompt)
+                    router.build_context_output(state, docs_root)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            phases[f"build_context_output/{length}"] = summarize(
+                output_step.ns, peak, after - before if before is not None and after is not None else None
+            )
+
+            phases[f"main/{length}"] = run_phase(main_step, prompts)
+            phases[f"hook_process/{length}"] = bench_hook_process(project, prompts[:HOOK_PROCESS_TURNS])
+    finally:
+        os.chdir(prev_cwd)
+
+    return {**corpus, "phases": phases}
+
+
+def bench_hook_process(project: Path, prompts: List[str]) -> dict:
+    """Full hook invocations as a subprocess, as Claude Code runs it."""
+    samples = []
+    for prompt in prompts:
+        start = time.perf_counter_ns()
+        subprocess.run(
+            [sys.executable, str(ROUTER_PATH)],
+            input=json.dumps({"prompt": prompt}),
+            cwd=project,
+            capture_output=True,
+            text=True,
+        )
+        samples.append(time.perf_counter_ns() - start)
+    return summarize(samples, None, None)
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def format_results(results: dict, baseline: Optional[dict], threshold: float) -> (str, int):
+    """Table of results; with a baseline, p95 ratios and regression flags."""
+    lines = []
+    regressions = 0
+    header = f"{'size':>7}  {'phase':<30} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>9} {'read/call':>10}"
+    if baseline:
+        header += f" {'p95 vs base':>12}"
+    lines.append(header)
+    lines.append("-" * len(header))
+
+    for size, result in results["results"].items():
+        for phase, s in result["phases"].items():
+            row = (
+                f"{size:>7}  {phase:<30} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} "
+                f"{s['peak_kib'] if s['peak_kib'] is not None else '-':>9} "
+                f"{s['read_bytes_per_call'] if s['read_bytes_per_call'] is not None else '-':>10}"
+            )
+            base = (baseline or {}).get("results", {}).get(size, {}).get("phases", {}).get(phase)
+            if base and base.get("p95_ms"):
+                ratio = s["p95_ms"] / base["p95_ms"]
+                flag = " ⚠" if ratio > threshold else ""
+                regressions += bool(flag)
+                row += f" {ratio:>10.2f}x{flag}"
+            lines.append(row)
+        lines.append(
+            f"{'':>7}  ({result['docs']} docs, {result['keywords']} keywords, {result['edges']} edges; "
+            f"import {result['import_cold_ms']} ms cold / {result['import_cached_ms']} ms cached)"
+        )
+    return "\n".join(lines), regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Context router benchmark",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--sizes", default="20,500,5000,50000", help="Comma-separated doc counts")
+    parser.add_argument("--turns", type=int, default=50, help="Prompts per phase and prompt length (default: 50)")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus/prompt RNG seed")
+    parser.add_argument("--out", type=str, help="Write results JSON here")
+    parser.add_argument("--baseline", type=str, help="Compare against a previous results JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p95 ratio flagged as regression (default: 1.25)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated corpora")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    work_dir = Path(tempfile.mkdtemp(prefix="router-bench-"))
+    home = work_dir / "home"
+    (home / ".claude").mkdir(parents=True)
+
+    # Every HOME-relative path (history, logs, state) must point into work_dir
+    # before the router or its helpers are first imported
+    os.environ["HOME"] = str(home)
+    for var in ("CONTEXT_DOCS_ROOT", "CLAUDE_INSTANCE", "CONTEXT_LOG_DEBUG", "CONTEXT_LOG_SAMPLE"):
+        os.environ.pop(var, None)
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "turns": args.turns,
+            "seed": args.seed,
+            "env": {k: v for k, v in os.environ.items() if k.startswith("CONTEXT_")},
+        },
+        "results": {},
+    }
+
+    rng = random.Random(args.seed)
+    try:
+        for n_docs in sizes:
+            print(f"ℹ Benchmarking {n_docs} docs...", file=sys.stderr)
+            results["results"][str(n_docs)] = bench_size(n_docs, args.turns, work_dir, rng)
+    finally:
+        if args.keep:
+            print(f"ℹ Corpora kept in {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = json.loads(Path(args.baseline).read_text())
+        except (OSError, ValueError) as e:
+            print(f"⚠ Could not read baseline {args.baseline}: {e}", file=sys.stderr)
+
+    table, regressions = format_results(results, baseline, args.threshold)
+    print(table)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+        print(f"\n✓ Results written to {args.out}", file=sys.stderr)
+
+    if regressions:
+        print(f"\n⚠ {regressions} phase(s) slower than {args.threshold}x baseline p95", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
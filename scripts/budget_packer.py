@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Budget Packer - token-aware selection of injected context
+
+Chooses, for every candidate doc, whether to inject it in full (HOT), as a
+header (WARM) or not at all, maximizing total attention score within a token
+budget. This is a multiple-choice 0/1 knapsack solved by dynamic programming
+over a fixed number of budget buckets, so run time is bounded by
+O(candidates x PACK_RESOLUTION) regardless of doc sizes.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PACK_RESOLUTION = 200      # Budget buckets for the DP (higher = finer, slower)
+WARM_VALUE_RATIO = 0.35    # A header is worth this fraction of the full doc
+
+# Words, numbers and individual punctuation marks
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local token estimate.
+
+    Roughly one token per 4 chars for prose, but never fewer than one token
+    per word or punctuation mark (code, paths and tables run denser).
+    """
+    if not text:
+        return 0
+    return max(len(_PIECE_RE.findall(text)), (len(text) + 3) // 4)
+
+
+class PackCandidate:
+    """One doc that may be injected HOT (full) or WARM (header)."""
+
+    __slots__ = ("file", "score", "hot_tokens", "warm_tokens")
+
+    def __init__(self, file: str, score: float, hot_tokens: Optional[int], warm_tokens: Optional[int]):
+        self.file = file
+        self.score = score
+        self.hot_tokens = hot_tokens    # None = not eligible for HOT
+        self.warm_tokens = warm_tokens  # None = no header available
+
+
+def pack(
+    candidates: List[PackCandidate],
+    budget_tokens: int,
+    max_hot: int,
+    max_warm: int,
+    warm_value: float = WARM_VALUE_RATIO,
+    resolution: int = PACK_RESOLUTION,
+) -> Dict[str, str]:
+    """
+    Select a tier per candidate.
+
+    Token weights are rounded up to whole buckets, so any selection the DP
+    accepts fits the real budget. File-count caps are applied afterwards by
+    demoting the lowest-scored overflow HOT docs to WARM, then dropping the
+    lowest-scored overflow WARM docs; both only free budget.
+
+    Returns:
+        {file: "HOT" | "WARM"} for every selected candidate
+    """
+    if budget_tokens <= 0 or not candidates:
+        return {}
+
+    bucket = max(1, -(-budget_tokens // resolution))
+    capacity = budget_tokens // bucket
+
+    def weight(tokens: Optional[int]) -> Optional[int]:
+        if tokens is None:
+            return None
+        w = -(-tokens // bucket)
+        return w if w <= capacity else None
+
+    # best[c] = best value using at most c buckets; choices[i][c] = option taken
+    best = [0.0] * (capacity + 1)
+    choices: List[bytearray] = []
+    for cand in candidates:
+        hot_w = weight(cand.hot_tokens)
+        warm_w = weight(cand.warm_tokens)
+        hot_v = cand.score
+        warm_v = cand.score * warm_value
+        row = bytearray(capacity + 1)
+        new_best = best[:]
+        for c in range(capacity + 1):
+            if warm_w is not None and warm_w <= c:
+                v = best[c - warm_w] + warm_v
+                if v > new_best[c]:
+                    new_best[c] = v
+                    row[c] = 1
+            if hot_w is not None and hot_w <= c:
+                v = best[c - hot_w] + hot_v
+                if v > new_best[c]:
+                    new_best[c] = v
+                    row[c] = 2
+        best = new_best
+        choices.append(row)
+
+    # Reconstruct from the full capacity backwards
+    selection: Dict[str, str] = {}
+    c = capacity
+    for cand, row in zip(reversed(candidates), reversed(choices)):
+        option = row[c]
+        if option == 2:
+            selection[cand.file] = "HOT"
+            c -= weight(cand.hot_tokens)
+        elif option == 1:
+            selection[cand.file] = "WARM"
+            c -= weight(cand.warm_tokens)
+
+    # Enforce file-count caps
+    by_score = sorted(candidates, key=lambda cand: cand.score, reverse=True)
+    hot = [cand for cand in by_score if selection.get(cand.file) == "HOT"]
+    for cand in hot[max_hot:]:
+        if cand.warm_tokens is not None and cand.warm_tokens <= cand.hot_tokens:
+            selection[cand.file] = "WARM"
+        else:
+            del selection[cand.file]
+    warm = [cand for cand in by_score if selection.get(cand.file) == "WARM"]
+    for cand in warm[max_warm:]:
+        del selection[cand.file]
+
+    return selection
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Chunk Index - heading-level sections of docs for chunked HOT injection
+
+Each doc is split at headings (levels 1 to MAX_HEADING_LEVEL, outside code
+fences) into sections. Text before the first heading is its own section.
+Every section carries the terms that activate it:
+
+- words of its heading
+- the doc's keywords (from keywords.json) that occur in its text as whole
+  words (token_matcher normalization)
+
+Stored at <docs_root>/.cache/chunks.json. Each doc's sections are keyed by
+the doc's (mtime_ns, size) and its keyword list, so only docs that changed
+are re-split on the next lookup.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from doc_cache import DocCache
+from docs_manifest import CACHE_DIRNAME
+from token_matcher import normalize_phrase
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CHUNK_INDEX_VERSION = 2
+CHUNK_INDEX_FILENAME = "chunks.json"
+MAX_HEADING_LEVEL = 3       # Split at #, ## and ###; deeper headings stay inside
+MIN_TERM_LENGTH = 4         # Shorter heading words are too generic to activate
+
+_HEADING_RE = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$")
+_FENCE_RE = re.compile(r"^[ \t]*(```|~~~)")
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9_-]*")
+
+HEADING_STOP_WORDS = {
+    "about", "also", "and", "from", "into", "notes", "other", "overview",
+    "section", "summary", "that", "their", "these", "this", "with", "what", "when",
+}
+
+
+class Section:
+    """One heading-delimited span of a doc."""
+
+    __slots__ = ("anchor", "heading", "level", "start", "end", "terms")
+
+    def __init__(self, anchor: str, heading: str, level: int, start: int, end: int, terms: List[str]):
+        self.anchor = anchor        # Slug, unique within the doc ("" = text before the first heading)
+        self.heading = heading
+        self.level = level          # 0 for the preamble
+        self.start = start          # Char offsets into the doc text
+        self.end = end
+        self.terms = terms          # Lowercased activation terms
+
+    def to_list(self) -> list:
+        return [self.anchor, self.heading, self.level, self.start, self.end, self.terms]
+
+    @classmethod
+    def from_list(cls, data: list) -> "Section":
+        return cls(*data)
+
+
+def slugify(heading: str) -> str:
+    """GitHub-style anchor: lowercase, punctuation dropped, spaces to dashes."""
+    slug = re.sub(r"[^\w\- ]", "", heading.lower()).strip()
+    return re.sub(r"\s+", "-", slug) or "section"
+
+
+def split_sections(text: str, file_keywords: List[str]) -> List[Section]:
+    """Split a doc's text into sections at headings up to MAX_HEADING_LEVEL."""
+    bounds = []   # (start offset, level, heading)
+    offset = 0
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        if _FENCE_RE.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = _HEADING_RE.match(line.rstrip("\n"))
+            if match and len(match.group(1)) <= MAX_HEADING_LEVEL:
+                bounds.append((offset, len(match.group(1)), match.group(2)))
+        offset += len(line)
+
+    if not bounds or bounds[0][0] > 0 and text[:bounds[0][0]].strip():
+        bounds.insert(0, (0, 0, ""))
+    elif bounds[0][0] > 0:
+        bounds[0] = (0,) + bounds[0][1:]   # Blank lines before the first heading
+
+    keywords = [k.lower() for k in file_keywords]
+    sections = []
+    seen: Dict[str, int] = {}
+    for i, (start, level, heading) in enumerate(bounds):
+        end = bounds[i + 1][0] if i + 1 < len(bounds) else len(text)
+        anchor = slugify(heading) if level else ""
+        if anchor in seen:
+            seen[anchor] += 1
+            anchor = f"{anchor}-{seen[anchor]}"
+        else:
+            seen[anchor] = 0
+
+        body = f" {normalize_phrase(text[start:end])} "
+        terms = [
+            w for w in dict.fromkeys(_WORD_RE.findall(heading.lower()))
+            if len(w) >= MIN_TERM_LENGTH and w not in HEADING_STOP_WORDS
+        ]
+        terms += [k for k in keywords if k not in terms and f" {normalize_phrase(k)} " in body]
+        sections.append(Section(anchor, heading or "(top)", level, start, end, terms))
+    return sections
+
+
+class ChunkIndex:
+    """Per-docs-root section index, persisted and validated per doc."""
+
+    def __init__(self, docs_root: Path):
+        self.docs_root = docs_root
+        self.path = docs_root / CACHE_DIRNAME / CHUNK_INDEX_FILENAME
+        self.docs: Dict[str, list] = {}   # rel path -> [mtime_ns, size, keywords, [section lists]]
+        self._sections: Dict[str, List[Section]] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, docs_root: Path) -> "ChunkIndex":
+        """Load the persisted index (empty if missing, stale or corrupt)."""
+        index = cls(docs_root)
+        try:
+            data = json.loads(index.path.read_text())
+            if data.get("version") == CHUNK_INDEX_VERSION:
+                index.docs = data["docs"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return index
+
+    def save(self) -> None:
+        """Atomically persist the index if any doc was re-split."""
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({"version": CHUNK_INDEX_VERSION, "docs": self.docs}))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            pass  # Read-only docs root: index still works in memory
+
+    def sections(self, file_path: str, cache: DocCache, file_keywords: List[str]) -> Optional[List[Section]]:
+        """
+        Sections of a doc, re-split only if the doc or its keywords changed.
+        Returns None if the doc is missing or unreadable.
+        """
+        signature = cache.signature(file_path)
+        if signature is None:
+            self._sections.pop(file_path, None)
+            return None
+
+        cached = self.docs.get(file_path)
+        if cached and (cached[0], cached[1]) == signature and cached[2] == file_keywords:
+            if file_path not in self._sections:
+                self._sections[file_path] = [Section.from_list(s) for s in cached[3]]
+            return self._sections[file_path]
+
+        try:
+            entry = cache.get(file_path)
+        except (OSError, UnicodeError):
+            return None
+        if entry is None:
+            return None
+        sections = split_sections(entry.text, file_keywords)
+        self.docs[file_path] = [entry.signature[0], entry.signature[1], list(file_keywords), [s.to_list() for s in sections]]
+        self._sections[file_path] = sections
+        self._dirty = True
+        return sections
+
+
+# Indexes by docs root (persist across turns under the router daemon)
+_INDEXES: Dict[Path, ChunkIndex] = {}
+
+
+def get_chunk_index(docs_root: Path) -> ChunkIndex:
+    """Load the chunk index for a docs root once per process."""
+    index = _INDEXES.get(docs_root)
+    if index is None:
+        index = _INDEXES[docs_root] = ChunkIndex.load(docs_root)
+    return index
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Content Index - BM25 inverted index over doc text
+
+A second activation signal next to keywords.json: prompts are scored
+against the words of every doc under the docs root, so a doc whose body
+matches a prompt can activate without a hand-written keyword.
+
+Layout (under <docs_root>/.cache/):
+    content-<gen>.main     main segment metadata: doc table, lengths,
+                           signatures, term dictionary (written at merge)
+    content-<gen>.post     main segment postings, per term: doc ids (u32[])
+                           then term frequencies (u16[]); read through mmap,
+                           only for the terms of a query
+    content.idx            delta: docs indexed since the merge, their
+                           postings, tombstones and pending docs (small;
+                           rewritten only when it changes)
+
+Updates are incremental. Changed and new docs are indexed into the delta
+segment; removed or re-indexed docs are tombstoned. Once the delta holds
+MERGE_RATIO of the main segment's docs, both are merged into a new
+generation, so concurrent readers never see a torn file. Document
+frequencies count tombstoned docs until the next merge.
+
+The prompt path only calls refresh(): it syncs the doc set when the docs
+manifest saw docs added or removed and indexes at most PROMPT_INDEX_BUDGET
+new docs. Edit detection (a stat of every indexed doc), bulk indexing and
+merges happen in maintain(), run off the prompt path: by the router daemon
+after replying, and by the Stop hook (usage-track-stop.py) in one-shot mode.
+`python3 content_index.py build` indexes everything at once.
+
+The .main and .idx files are a JSON header line (version, root, generation;
+checked first) followed by pickled plain data, unpickled with only array
+reconstruction allowed, so a planted cache file cannot run code.
+
+Usage: python3 content_index.py build [DOCS_ROOT]
+       python3 content_index.py maintain [DOCS_ROOT]
+       python3 content_index.py query "text" [DOCS_ROOT]
+"""
+
+import heapq
+import importlib.util
+import io
+import json
+import math
+import mmap
+import os
+import pickle
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from docs_manifest import CACHE_DIRNAME, DocsManifest, get_docs_manifest
+from token_matcher import normalize_tokens
+
+# NumPy scoring is optional and imported on the first query that uses it,
+# so the router's import of this module stays cheap
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CONTENT_INDEX_VERSION = 4
+META_FILENAME = "content.idx"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_QUERY_TERMS = 16        # Highest-IDF prompt terms scored per query
+PROMPT_INDEX_BUDGET = 8     # New docs indexed per refresh() on the prompt path
+INDEX_BUDGET = 200          # Docs (re)indexed per maintain()
+MERGE_MIN_DOCS = 256        # Merge the delta once it holds this many docs...
+MERGE_RATIO = 0.25          # ...and this fraction of the main segment's docs
+MAX_TF = 0xFFFF
+NUMPY_MIN_DOCS = 2048       # Score with NumPy from this many indexed docs (import ~100 ms)
+
+STOP_WORDS = {
+    "the", "and", "for", "are", "but", "not", "you", "all", "can", "had", "her", "was",
+    "one", "our", "out", "has", "have", "this", "that", "with", "from", "they", "will",
+    "would", "there", "their", "what", "about", "which", "when", "make", "like", "into",
+    "than", "then", "them", "these", "some", "could", "other", "more", "also", "its",
+    "any", "how", "use", "used", "using", "should", "does", "just", "very", "only",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized word tokens as for keyword matching (3+ chars, stop words removed)."""
+    return [t for t in normalize_tokens(text) if len(t) > 2 and t not in STOP_WORDS]
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+# The only globals the pickled index data refers to
+_DATA_GLOBALS = {("array", "array"), ("array", "_array_reconstructor")}
+
+
+class _DataUnpickler(pickle.Unpickler):
+    """Unpickler that refuses any global outside _DATA_GLOBALS."""
+
+    def find_class(self, module: str, name: str):
+        if (module, name) not in _DATA_GLOBALS:
+            raise pickle.UnpicklingError(f"{module}.{name} not allowed in the content index")
+        return super().find_class(module, name)
+
+
+def _read_data(path: Path, expected: dict) -> dict:
+    """
+    Data of a cache file whose JSON header line matches expected (checked
+    before anything is unpickled). Raises ValueError/OSError/UnpicklingError
+    otherwise.
+    """
+    stream = io.BytesIO(path.read_bytes())
+    header = json.loads(stream.readline())
+    if not isinstance(header, dict) or any(header.get(k) != v for k, v in expected.items()):
+        raise ValueError(f"{path.name}: stale or foreign header")
+    data = _DataUnpickler(stream).load()
+    if not isinstance(data, dict):
+        raise ValueError(f"{path.name}: not an index")
+    return data
+
+
+class ContentIndex:
+    """BM25 index of one docs root: mmap'd main segment + in-memory delta."""
+
+    def __init__(self, docs_root: Path):
+        self.docs_root = docs_root
+        self.cache_dir = docs_root / CACHE_DIRNAME
+        self.docs: List[str] = []                       # doc id -> path
+        self.lengths = array("I")                       # doc id -> token count
+        self.doc_ids: Dict[str, int] = {}               # live path -> doc id
+        self.signatures: Dict[str, Tuple[int, int]] = {}  # live path -> (mtime_ns, size)
+        self.deleted: Set[int] = set()
+        self.total_len = 0                              # Tokens in live docs
+        self.docs_stamp = 0                             # Manifest docs_stamp at the last doc-set sync
+        self.pending: List[str] = []                    # Docs waiting to be (re)indexed
+
+        self.generation = 0                             # Main segment postings file
+        self.main_docs = 0                              # Doc ids below this are in the main segment
+        self.vocab: Dict[str, Tuple[int, int]] = {}     # term -> (byte offset, doc count)
+        self.delta: Dict[str, Dict[int, int]] = {}      # term -> {doc id: tf}
+
+        self._dirty = False
+        self._map: Optional[mmap.mmap] = None
+
+    # ------------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------------
+
+    @property
+    def meta_path(self) -> Path:
+        return self.cache_dir / META_FILENAME
+
+    def postings_path(self, generation: int) -> Path:
+        return self.cache_dir / f"content-{generation}.post"
+
+    def main_path(self, generation: int) -> Path:
+        return self.cache_dir / f"content-{generation}.main"
+
+    @classmethod
+    def load(cls, docs_root: Path) -> "ContentIndex":
+        """Load the persisted index (empty if missing, stale or corrupt)."""
+        index = cls(docs_root)
+        expected = {"version": CONTENT_INDEX_VERSION, "root": str(docs_root)}
+        try:
+            meta = _read_data(index.meta_path, expected)
+            generation = meta["generation"]
+            main = {"docs": [], "lengths": array("I"), "signatures": {}, "vocab": {}}
+            if generation:
+                main = _read_data(index.main_path(generation), {**expected, "generation": generation})
+            index.generation = generation
+            index.main_docs = len(main["docs"])
+            index.docs = main["docs"] + meta["docs"]
+            index.lengths = main["lengths"] + meta["lengths"]
+            index.signatures = {**main["signatures"], **meta["signatures"]}
+            index.vocab = main["vocab"]
+            for key in ("deleted", "pending", "delta", "docs_stamp"):
+                setattr(index, key, meta[key])
+        except Exception:
+            return cls(docs_root)
+        if index.vocab and not index.postings_path(index.generation).exists():
+            return cls(docs_root)  # Metadata outlived its segment (merged elsewhere): rebuild
+        index.doc_ids = {path: i for i, path in enumerate(index.docs) if i not in index.deleted}
+        index.signatures = {p: sig for p, sig in index.signatures.items() if p in index.doc_ids}
+        index.total_len = sum(index.lengths[i] for i in index.doc_ids.values())
+        return index
+
+    def _dump(self, path: Path, generation: int, data: dict) -> None:
+        """Atomically write header line + pickled data to path (raises OSError)."""
+        header = {"version": CONTENT_INDEX_VERSION, "root": str(self.docs_root), "generation": generation}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def save(self) -> None:
+        """Atomically persist the delta segment if anything changed (the main segment is written by merge())."""
+        if not self._dirty:
+            return
+        main_docs = self.main_docs
+        meta = {
+            "generation": self.generation,
+            "docs_stamp": self.docs_stamp,
+            "docs": self.docs[main_docs:],
+            "lengths": self.lengths[main_docs:],
+            "signatures": {p: sig for p, sig in self.signatures.items() if self.doc_ids[p] >= main_docs},
+            "deleted": self.deleted,
+            "pending": self.pending,
+            "delta": self.delta,
+        }
+        try:
+            self._dump(self.meta_path, self.generation, meta)
+            self._dirty = False
+        except OSError:
+            pass  # Read-only docs root: index still works in memory
+
+    def _postings(self) -> Optional[mmap.mmap]:
+        """Mapping of the main segment's postings file (None if empty or missing)."""
+        if self._map is None and self.vocab:
+            try:
+                with open(self.postings_path(self.generation), "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return None
+        return self._map
+
+    def _main_postings(self, term: str) -> Tuple[Iterable[int], Iterable[int]]:
+        """(doc ids, term frequencies) of a term in the main segment."""
+        entry = self.vocab.get(term)
+        postings = self._postings() if entry else None
+        if postings is None:
+            return (), ()
+        offset, count = entry
+        ids = array("I", postings[offset:offset + 4 * count])
+        tfs = array("H", postings[offset + 4 * count:offset + 6 * count])
+        return ids, tfs
+
+    # ------------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------------
+
+    def _remove(self, path: str) -> None:
+        doc_id = self.doc_ids.pop(path, None)
+        self.signatures.pop(path, None)
+        if doc_id is not None:
+            self.deleted.add(doc_id)
+            self.total_len -= self.lengths[doc_id]
+            self._dirty = True
+
+    def _index_doc(self, path: str) -> None:
+        """(Re)index one doc into the delta segment."""
+        self._remove(path)
+        abs_path = self.docs_root / path
+        try:
+            st = abs_path.stat()
+            text = abs_path.read_text(errors="replace")
+        except OSError:
+            return
+
+        counts: Dict[str, int] = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+
+        doc_id = len(self.docs)
+        self.docs.append(path)
+        length = sum(counts.values())
+        self.lengths.append(length)
+        self.doc_ids[path] = doc_id
+        self.signatures[path] = (st.st_mtime_ns, st.st_size)
+        self.total_len += length
+        for term, tf in counts.items():
+            self.delta.setdefault(term, {})[doc_id] = min(tf, MAX_TF)
+        self._dirty = True
+
+    def _sync_docs(self, manifest: DocsManifest) -> None:
+        """Tombstone docs gone from the manifest and queue docs not yet indexed."""
+        live = dict(manifest.docs)  # Snapshot: the daemon's prompt path may refresh the manifest
+        for path in [p for p in self.doc_ids if p not in live]:
+            self._remove(path)
+        queued = set(self.pending)
+        new = [p for p in live if p not in self.signatures and p not in queued]
+        if new:
+            self.pending.extend(new)
+            self._dirty = True
+        if self.docs_stamp != manifest.docs_stamp:
+            self.docs_stamp = manifest.docs_stamp
+            self._dirty = True
+
+    def _index_pending(self, budget: int) -> None:
+        if self.pending:
+            batch, self.pending = self.pending[:budget], self.pending[budget:]
+            for path in batch:
+                self._index_doc(path)
+            self._dirty = True
+
+    def refresh(self, manifest: DocsManifest, index_budget: int = PROMPT_INDEX_BUDGET) -> None:
+        """
+        Prompt-path catch-up: sync the doc set if the manifest saw docs added
+        or removed, then index up to index_budget pending docs. Costs nothing
+        on an unchanged tree.
+        """
+        if manifest.docs_stamp != self.docs_stamp:
+            self._sync_docs(manifest)
+        self._index_pending(index_budget)
+
+    def maintain(self, manifest: DocsManifest, index_budget: int = INDEX_BUDGET) -> None:
+        """
+        Off-prompt upkeep: full doc-set sync, a stat of every indexed doc for
+        in-place edits, indexing up to index_budget docs, and a merge once
+        the delta is large enough.
+        """
+        self._sync_docs(manifest)
+        queued = set(self.pending)
+        for path, signature in list(self.signatures.items()):
+            try:
+                st = (self.docs_root / path).stat()
+            except OSError:
+                self._remove(path)
+                continue
+            if (st.st_mtime_ns, st.st_size) != signature and path not in queued:
+                self.pending.append(path)
+                self._dirty = True
+        self._index_pending(index_budget)
+
+        delta_docs = len(self.docs) - self.main_docs
+        if delta_docs >= MERGE_MIN_DOCS and delta_docs >= MERGE_RATIO * self.main_docs:
+            self.merge()
+
+    def merge(self) -> None:
+        """Rewrite main + delta (minus tombstones) as a new main segment with dense ids."""
+        live = sorted(self.doc_ids.values())
+        remap = {old: new for new, old in enumerate(live)}
+
+        merged: Dict[str, Tuple[array, array]] = {}
+        for term in set(self.vocab) | set(self.delta):
+            ids_out, tfs_out = array("I"), array("H")
+            ids, tfs = self._main_postings(term)
+            for doc_id, tf in zip(ids, tfs):
+                if doc_id in remap:
+                    ids_out.append(remap[doc_id])
+                    tfs_out.append(tf)
+            for doc_id, tf in self.delta.get(term, {}).items():
+                if doc_id in remap:
+                    ids_out.append(remap[doc_id])
+                    tfs_out.append(tf)
+            if ids_out:
+                merged[term] = (ids_out, tfs_out)
+
+        generation = self.generation + 1
+        vocab: Dict[str, Tuple[int, int]] = {}
+        path = self.postings_path(generation)
+        docs = [self.docs[i] for i in live]
+        lengths = array("I", (self.lengths[i] for i in live))
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                offset = 0
+                for term, (ids, tfs) in merged.items():
+                    vocab[term] = (offset, len(ids))
+                    f.write(ids.tobytes())
+                    f.write(tfs.tobytes())
+                    offset += 6 * len(ids)
+            os.replace(tmp_path, path)
+            self._dump(self.main_path(generation), generation, {
+                "docs": docs,
+                "lengths": lengths,
+                "signatures": {p: self.signatures[p] for p in docs},
+                "vocab": vocab,
+            })
+        except OSError:
+            return  # Keep serving from the current segments
+
+        old_paths = [self.postings_path(self.generation), self.main_path(self.generation)]
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.docs, self.lengths = docs, lengths
+        self.doc_ids = {p: i for i, p in enumerate(self.docs)}
+        self.deleted = set()
+        self.generation, self.main_docs = generation, len(self.docs)
+        self.vocab, self.delta = vocab, {}
+        self._dirty = True
+        self.save()
+        for old_path in old_paths:
+            try:
+                old_path.unlink()
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------------
+
+    def search(self, text: str, top_k: int) -> List[Tuple[str, float]]:
+        """Top-k live docs by BM25 score for text, highest first."""
+        n_live = len(self.doc_ids)
+        if not n_live:
+            return []
+        avgdl = max(self.total_len / n_live, 1.0)
+
+        def df(term: str) -> int:
+            return self.vocab.get(term, (0, 0))[1] + len(self.delta.get(term, ()))
+
+        terms = [(t, df(t)) for t in set(tokenize(text))]
+        terms = [
+            (t, math.log(1 + (n_live - d + 0.5) / (d + 0.5)))
+            for t, d in terms if d
+        ]
+        terms = heapq.nlargest(MAX_QUERY_TERMS, terms, key=lambda x: x[1])
+        if not terms:
+            return []
+
+        if NUMPY_AVAILABLE and len(self.docs) >= NUMPY_MIN_DOCS:
+            try:
+                return self._search_numpy(terms, avgdl, top_k)
+            except ImportError:
+                pass  # Installed but not importable: pure-Python scoring
+
+        scores: Dict[int, float] = {}
+        lengths = self.lengths
+        for term, idf in terms:
+            ids, tfs = self._main_postings(term)
+            delta = self.delta.get(term, {})
+            for doc_id, tf in list(zip(ids, tfs)) + list(delta.items()):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        for doc_id in self.deleted:
+            scores.pop(doc_id, None)
+        top = heapq.nlargest(top_k, scores.items(), key=lambda x: x[1])
+        return [(self.docs[i], s) for i, s in top]
+
+    def _search_numpy(self, terms: List[Tuple[str, float]], avgdl: float, top_k: int) -> List[Tuple[str, float]]:
+        import numpy as np
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32) if len(self.lengths) else np.zeros(0)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avgdl)
+        scores = np.zeros(len(self.docs), dtype=np.float64)
+        postings = self._postings()
+        for term, idf in terms:
+            entry = self.vocab.get(term)
+            if entry and postings is not None:
+                offset, count = entry
+                ids = np.frombuffer(postings, dtype=np.uint32, count=count, offset=offset)
+                tfs = np.frombuffer(postings, dtype=np.uint16, count=count, offset=offset + 4 * count).astype(np.float64)
+                scores[ids] += idf * tfs * (BM25_K1 + 1) / (tfs + norm[ids])
+            delta = self.delta.get(term)
+            if delta:
+                ids = np.fromiter(delta.keys(), dtype=np.int64, count=len(delta))
+                tfs = np.fromiter(delta.values(), dtype=np.float64, count=len(delta))
+                scores[ids] += idf * tfs * (BM25_K1 + 1) / (tfs + norm[ids])
+        if self.deleted:
+            scores[np.fromiter(self.deleted, dtype=np.int64, count=len(self.deleted))] = 0.0
+
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(self.docs[i], float(scores[i])) for i in hits]
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+# Indexes by docs root (persist across turns under the router daemon)
+_INDEXES: Dict[Path, ContentIndex] = {}
+
+
+def get_content_index(docs_root: Path, refresh: bool = True) -> ContentIndex:
+    """Load (once per process) and optionally refresh the content index for a docs root."""
+    index = _INDEXES.get(docs_root)
+    if index is None:
+        index = _INDEXES[docs_root] = ContentIndex.load(docs_root)
+    if refresh:
+        index.refresh(get_docs_manifest(docs_root, refresh=False))
+        index.save()
+    return index
+
+
+def maintain_content_index(docs_root: Path, refresh_manifest: bool = True) -> None:
+    """Edit detection, indexing and merging for a docs root (off the prompt path)."""
+    index = get_content_index(docs_root, refresh=False)
+    index.maintain(get_docs_manifest(docs_root, refresh=refresh_manifest))
+    index.save()
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("build", "maintain", "query"):
+        print("Usage: content_index.py build|maintain [DOCS_ROOT] | query \"text\" [DOCS_ROOT]", file=sys.stderr)
+        sys.exit(2)
+
+    if sys.argv[1] == "maintain":
+        maintain_content_index(Path(sys.argv[2] if len(sys.argv) > 2 else ".claude").resolve())
+        return
+
+    if sys.argv[1] == "build":
+        docs_root = Path(sys.argv[2] if len(sys.argv) > 2 else ".claude").resolve()
+        index = get_content_index(docs_root, refresh=False)
+        index.maintain(get_docs_manifest(docs_root), index_budget=sys.maxsize)
+        index.merge()
+        print(f"✓ Indexed {len(index.doc_ids)} docs, {len(index.vocab)} terms in {index.cache_dir}", file=sys.stderr)
+        return
+
+    if len(sys.argv) < 3:
+        print("⚠ query needs text", file=sys.stderr)
+        sys.exit(2)
+    docs_root = Path(sys.argv[3] if len(sys.argv) > 3 else ".claude").resolve()
+    for path, score in get_content_index(docs_root).search(sys.argv[2], 10):
+        print(f"{score:8.3f}  {path}")
+
+
+if __name__ == "__main__":
+    main()
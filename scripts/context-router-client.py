@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Context Router Client - UserPromptSubmit Hook
+Forwards the hook input to a running router daemon and prints its reply.
+
+Start the daemon once per project (from the project directory):
+  python3 ~/.claude/scripts/context-router-v2.py --serve &
+
+When no daemon is listening (or it rejects the request), the router runs
+in-process exactly as if context-router-v2.py had been the hook.
+"""
+import io
+import runpy
+import sys
+from pathlib import Path
+
+# Add scripts to path for importing
+sys.path.insert(0, str(Path(__file__).parent))
+
+from router_ipc import build_request, send_request
+
+ROUTER_SCRIPT = Path(__file__).parent / "context-router-v2.py"
+
+
+def main():
+    """Main entry point."""
+    raw_input = sys.stdin.read()
+
+    reply = send_request(build_request(raw_input))
+    if reply is not None and "output" in reply:
+        if reply["output"]:
+            print(reply["output"])
+        return
+
+    # Fallback: in-process router reading the same stdin
+    sys.stdin = io.StringIO(raw_input)
+    runpy.run_path(str(ROUTER_SCRIPT), run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
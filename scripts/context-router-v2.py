@@ -15,10 +15,14 @@ Features:
 - Pinned files: Critical topology always at least warm
 - State persistence: Attention scores survive across turns
 - Usage tracking: Log injections for learning (v1.2)
+- Daemon mode: --serve keeps config and state warm behind a Unix socket
 
-Usage: Called by UserPromptSubmit hook
+Usage: Called by UserPromptSubmit hook (directly, or via context-router-client.py)
 Input: JSON from stdin with "prompt" field
 Output: Tiered context to stdout
+
+Daemon: python3 context-router-v2.py --serve [--idle-timeout SECONDS]
+        (run from the project directory; one daemon per project)
 """
 
 import sys
@@ -28,10 +32,30 @@ from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
 from datetime import datetime
 import re
+import signal
+import socket
+import threading
+import time
+
+from attention_engine import AttentionEngine, NUMPY_AVAILABLE
+from budget_packer import PackCandidate, estimate_tokens, pack
+from chunk_index import get_chunk_index
+from content_index import get_content_index, maintain_content_index
+from doc_cache import DocCache
+from injection_ledger import InjectionLedger, block_hash, get_ledger_path
+from injection_log import append_record, sample_bodies
+from docs_manifest import get_docs_manifest
+from history_store import append_entry, compact_if_due
+from keyword_index import KeywordIndex, get_weights_path, load_keyword_index
+from token_matcher import normalize_phrase
+from usefulness import UsefulnessPolicy, get_usefulness_policy
+from phase_timer import PhaseTimer, append_metrics
+from router_ipc import get_socket_path, read_message, write_message, REPLY_TIMEOUT
+from state_store import SECTION_SEP, get_shard_path, prune_shards, read_latest_state, read_state, write_state
 
 # Try to import usage tracker (v1.2 feature, graceful fallback if missing)
 try:
-    from usage_tracker import UsageTracker
+    from usage_tracker import queue_injection
     USAGE_TRACKING_AVAILABLE = True
 except ImportError:
     USAGE_TRACKING_AVAILABLE = False
@@ -52,8 +76,6 @@ def resolve_docs_root() -> Path:
     Returns: Path to docs root
     Raises: FileNotFoundError if no valid docs directory found
     """
-    import glob
-
     # Priority 1: Explicit environment variable
     if env_root := os.getenv('CONTEXT_DOCS_ROOT'):
         env_path = Path(env_root).expanduser().resolve()
@@ -66,11 +88,11 @@ def resolve_docs_root() -> Path:
     # Priority 2: Project-local .claude/ (more explicit check)
     project_claude = Path.cwd() / ".claude"
     if project_claude.is_dir():
-        # Check if it has any .md files (not just exists)
-        md_files = list(project_claude.glob("**/*.md"))
-        if md_files:
+        # Check if it has any .md files (not just exists), via the cached manifest
+        md_count = len(get_docs_manifest(project_claude))
+        if md_count:
             print(f"ℹ Using project-local .claude: {project_claude}", file=sys.stderr)
-            print(f"  Found {len(md_files)} .md files", file=sys.stderr)
+            print(f"  Found {md_count} .md files", file=sys.stderr)
             return project_claude
         else:
             print(f"⚠ Project .claude/ exists but has no .md files: {project_claude}", file=sys.stderr)
@@ -78,10 +100,10 @@ def resolve_docs_root() -> Path:
     # Priority 3: Global ~/.claude/ (last resort)
     global_claude = Path.home() / ".claude"
     if global_claude.is_dir():
-        md_files = list(global_claude.glob("**/*.md"))
-        if md_files:
+        md_count = len(get_docs_manifest(global_claude))
+        if md_count:
             print(f"ℹ Using global ~/.claude: {global_claude}", file=sys.stderr)
-            print(f"  Found {len(md_files)} .md files", file=sys.stderr)
+            print(f"  Found {md_count} .md files", file=sys.stderr)
             return global_claude
         else:
             print(f"⚠ Global ~/.claude/ exists but has no .md files", file=sys.stderr)
@@ -110,13 +132,11 @@ def resolve_docs_root() -> Path:
 # CONFIGURATION
 # ============================================================================
 
-# State file location
-PROJECT_STATE = Path(".claude/attn_state.json")
-GLOBAL_STATE = Path.home() / ".claude" / "attn_state.json"
-HISTORY_FILE = Path.home() / ".claude" / "attention_history.jsonl"
-
-# History retention
-MAX_HISTORY_DAYS = 30  # Archive entries older than 30 days
+# State location: one binary shard per instance under <dir>/attn_state/ (see state_store.py)
+PROJECT_STATE_DIR = Path(".claude")
+GLOBAL_STATE_DIR = Path.home() / ".claude"
+# History: daily segments under ~/.claude/attention_history/, gzipped after
+# 2 days and deleted after MAX_HISTORY_DAYS (30); see history_store.py
 
 # Decay rates per category (how fast files fade when not mentioned)
 # Higher = slower decay (more persistent)
@@ -136,12 +156,61 @@ WARM_THRESHOLD = 0.25       # Header-only injection
 # Boost amounts
 KEYWORD_BOOST = 1.0         # Direct mention → score = 1.0
 COACTIVATION_BOOST = 0.35   # Related file boost
+PRUNE_BELOW = 0.01          # Forget files once their decayed score falls below this
+
+# Spreading activation over the co-activation graph: hop 1 adds
+# COACTIVATION_BOOST x edge weight, each further hop is attenuated, and
+# spreading stops where the boost would fall below SPREAD_MIN_BOOST
+SPREAD_HOPS = int(os.getenv("CONTEXT_SPREAD_HOPS", "2"))
+SPREAD_ATTENUATION = 0.75   # Hop 2 boost = 0.35 × 0.75 ≈ 0.26 (just WARM)
+SPREAD_MIN_BOOST = 0.05
+
+# Content activation: top BM25 hits of the prompt over doc text (content_index.py)
+# add CONTENT_WEIGHT × (score / best score); 0 (default) disables the content index
+CONTENT_WEIGHT = float(os.getenv("CONTEXT_CONTENT_WEIGHT", "0"))
+CONTENT_TOP_K = 5
+CONTENT_MIN_SCORE = 2.0     # BM25 score a hit needs (roughly one rare term)
+
+# Guards the in-process content index, which the daemon's background upkeep
+# (RouterDaemon.maintain) mutates; prompts never wait on it
+CONTENT_INDEX_LOCK = threading.Lock()
 
 # Limits (prevent context explosion)
 MAX_HOT_FILES = 4
 MAX_WARM_FILES = 8
 WARM_HEADER_LINES = 25      # Lines to extract for warm context
-MAX_TOTAL_CHARS = 25000     # Hard ceiling on total output
+MAX_TOTAL_CHARS = 25000     # Hard ceiling on total output (greedy packing)
+
+# Budget packing: "knapsack" (token-aware, maximizes total score) or "greedy" (score order, char ceiling)
+PACKING_MODE = os.getenv("CONTEXT_PACKING", "knapsack")
+MAX_TOTAL_TOKENS = 6000     # Token budget for knapsack packing
+BLOCK_OVERHEAD_TOKENS = 16  # Block header line per injected file
+MAX_PACK_CANDIDATES = 256   # Bounds packing time on huge corpora
+
+# Delta injection: re-emit a block's body only when it is new to the session,
+# changed tier or content; otherwise emit a one-line "still active" marker
+DELTA_MODE = os.getenv("CONTEXT_DELTA", "0") == "1"
+
+# Chunked injection: HOT docs inject only their activated heading sections
+# in full, plus an outline of the remaining sections
+CHUNK_MODE = os.getenv("CONTEXT_CHUNKS", "0") == "1"
+
+# Usefulness policy: scale each doc's packing value by how often its past
+# injections were used (usage_stats.json) and drop chronically unused docs
+# one tier; a no-op until the usage tracker has collected stats
+USEFULNESS_MODE = os.getenv("CONTEXT_USEFULNESS", "1") == "1"
+
+# Keyword config locations (project-local first, then global)
+KEYWORD_CONFIG_PATHS = [
+    Path(".claude/keywords.json"),
+    Path.home() / ".claude" / "keywords.json"
+]
+
+# Attention engine: "python" (plain dict walk, the default; "auto" is an alias)
+# or "numpy" (array engine, if available). State is a dict converted to
+# arrays every turn, so the array engine measures no faster than the dict
+# walk (256-20k tracked files) and is opt-in only.
+ATTENTION_ENGINE = os.getenv("CONTEXT_ENGINE", "python")
 
 # Pinned files (always at least WARM)
 PINNED_FILES = [
@@ -154,37 +223,37 @@ PINNED_FILES = [
 # Load keywords and co-activation from external config if available
 # ============================================================================
 
-def load_keyword_config() -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+def load_keyword_config() -> KeywordIndex:
     """
     Load keywords and co-activation graph from keywords.json (JSON).
+    Uses the compiled index cached in .claude/.cache/keywords.idx when it is
+    still fresh, rebuilding it when the config changes.
     Falls back to hardcoded defaults if config doesn't exist or fails to parse.
 
-    Returns: (keywords_dict, co_activation_dict)
+    Returns: KeywordIndex (keyword table, matcher, co-activation adjacency)
     """
     # Try project-local config first, then global
-    config_paths = [
-        Path(".claude/keywords.json"),
-        Path.home() / ".claude" / "keywords.json"
-    ]
-
-    for config_path in config_paths:
+    for config_path in KEYWORD_CONFIG_PATHS:
         if config_path.exists():
             try:
-                config = json.loads(config_path.read_text())
-                keywords = config.get("keywords", {})
-                co_activation = config.get("co_activation", {})
-
-                # Validate structure
-                if keywords and isinstance(keywords, dict):
-                    print(f"✓ Loaded keywords from {config_path}", file=sys.stderr)
-                    return keywords, co_activation
-            except (json.JSONDecodeError, Exception) as e:
+                index, from_cache = load_keyword_index(config_path)
+                source = "cached index" if from_cache else "rebuilt index"
+                print(f"✓ Loaded keywords from {config_path} ({source})", file=sys.stderr)
+                return index
+            except Exception as e:
                 print(f"⚠ Failed to load {config_path}: {e}", file=sys.stderr)
                 continue
 
     # Fallback to hardcoded (will be defined below as _DEFAULT_KEYWORDS)
     print("ℹ Using hardcoded keywords (no keywords.json found)", file=sys.stderr)
-    return _DEFAULT_KEYWORDS, _DEFAULT_CO_ACTIVATION
+    return KeywordIndex(_DEFAULT_KEYWORDS, _DEFAULT_CO_ACTIVATION)
+
+def validate_keyword_docs(docs_root: Path) -> None:
+    """Warn about keyword entries whose doc doesn't exist under docs_root."""
+    missing = get_docs_manifest(docs_root, refresh=False).missing(KEYWORDS)
+    if missing:
+        shown = ", ".join(missing[:5]) + (f" (+{len(missing) - 5} more)" if len(missing) > 5 else "")
+        print(f"⚠ {len(missing)} keyword entries have no doc under {docs_root}: {shown}", file=sys.stderr)
 
 # ============================================================================
 # KEYWORD MAPPINGS
@@ -417,41 +486,75 @@ _DEFAULT_CO_ACTIVATION: Dict[str, List[str]] = {
 }
 
 # Load actual configuration (from keywords.json or fallback to defaults)
-KEYWORDS, CO_ACTIVATION = load_keyword_config()
+_config_start = time.perf_counter_ns()
+KEYWORD_INDEX = load_keyword_config()
+CONFIG_LOAD_NS = time.perf_counter_ns() - _config_start  # Charged to the first turn's "config" phase
+KEYWORDS, CO_ACTIVATION = KEYWORD_INDEX.keywords, KEYWORD_INDEX.co_activation
 
 # ============================================================================
 # STATE MANAGEMENT
 # ============================================================================
 
-def get_state_file() -> Path:
-    """Get appropriate state file (project-local preferred)."""
-    if PROJECT_STATE.parent.exists():
-        return PROJECT_STATE
-    GLOBAL_STATE.parent.mkdir(parents=True, exist_ok=True)
-    return GLOBAL_STATE
+def get_state_dir() -> Path:
+    """Get appropriate state directory (project-local preferred)."""
+    if PROJECT_STATE_DIR.exists():
+        return PROJECT_STATE_DIR
+    GLOBAL_STATE_DIR.mkdir(parents=True, exist_ok=True)
+    return GLOBAL_STATE_DIR
+
+
+def get_instance_id(input_data: dict) -> str:
+    """State shard key: CLAUDE_INSTANCE, else the hook session, else "default"."""
+    return os.environ.get("CLAUDE_INSTANCE") or input_data.get("session_id") or "default"
+
+
+def get_state_file(instance_id: str = "default") -> Path:
+    """Get this instance's state shard."""
+    return get_shard_path(get_state_dir(), instance_id)
 
 
 def load_state(state_file: Path) -> dict:
-    """Load attention state from file."""
-    if state_file.exists():
-        try:
-            return json.loads(state_file.read_text())
-        except json.JSONDecodeError:
-            pass
-    
-    # Initialize fresh state
+    """
+    Load attention state from an instance shard.
+
+    state["touch"] holds [score_at_touch, touched_turn] per live file and is
+    the source of truth; state["scores"] is the decayed view at turn_count.
+    A new instance continues from the most recently written shard (or a
+    pre-shard attn_state.bin / attn_state.json), as if it were that
+    instance's next turn: its scores are stamped at turn 0, so the first
+    turn decays them once. Other, older shards don't contribute, so a new
+    session doesn't inherit every past session's HOT files.
+    """
+    state = read_state(state_file)
+    if state is not None:
+        return state
+
+    state_dir = state_file.parent.parent
+    prune_shards(state_dir)
+    latest = read_latest_state(state_dir)
+    scores = {
+        path: score
+        for path, score in (latest["scores"] if latest else {}).items()
+        if score >= PRUNE_BELOW
+    }
+
+    # Initialize fresh state (untracked files are COLD)
     return {
-        "scores": {path: 0.0 for path in KEYWORDS},
+        "touch": {path: [score, 0] for path, score in scores.items()},
+        "scores": scores,
+        "sections": {},
         "turn_count": 0,
         "last_update": datetime.now().isoformat(),
     }
 
 
 def save_state(state_file: Path, state: dict) -> None:
-    """Save attention state to file."""
+    """Save attention state to file (atomic replace)."""
     state["last_update"] = datetime.now().isoformat()
-    state_file.parent.mkdir(parents=True, exist_ok=True)
-    state_file.write_text(json.dumps(state, indent=2))
+    try:
+        write_state(state_file, state)
+    except OSError as e:
+        print(f"⚠ Could not save attention state: {e}", file=sys.stderr)
 
 
 # ============================================================================
@@ -466,40 +569,128 @@ def get_decay_rate(file_path: str) -> float:
     return DECAY_RATES["default"]
 
 
-def update_attention(state: dict, prompt: str) -> Tuple[dict, Set[str]]:
+# Array engine (persists across turns under the daemon, keeping interned decay factors)
+_ENGINE: Optional[AttentionEngine] = None
+
+
+def get_engine() -> Optional[AttentionEngine]:
+    """Array engine if CONTEXT_ENGINE=numpy selects it, or None for the dict path."""
+    global _ENGINE
+    if not NUMPY_AVAILABLE or ATTENTION_ENGINE != "numpy":
+        return None
+    if _ENGINE is None:
+        try:
+            _ENGINE = AttentionEngine(get_decay_rate)
+        except ImportError:
+            return None  # NumPy installed but not importable: dict path
+    return _ENGINE
+
+
+def materialize_scores(touch: Dict[str, List[float]], turn: int) -> Dict[str, float]:
+    """
+    Effective scores (score_at_touch × rate^(turn − touched_turn)) of live files.
+    Files that decayed below PRUNE_BELOW are dropped from touch.
+    """
+    engine = get_engine()
+    if engine is not None:
+        return engine.materialize(touch, turn, PRUNE_BELOW)
+
+    scores = {}
+    for path, (score, touched_turn) in list(touch.items()):
+        value = score * get_decay_rate(path) ** (turn - touched_turn)
+        if value < PRUNE_BELOW:
+            del touch[path]
+        else:
+            scores[path] = value
+    return scores
+
+
+def get_content_hits(prompt: str, docs_root: Path) -> Dict[str, float]:
+    """
+    Docs whose text matches the prompt (BM25 top CONTENT_TOP_K), as
+    relevance relative to the best hit. Empty if disabled or nothing scores
+    CONTENT_MIN_SCORE.
+    """
+    if CONTENT_WEIGHT <= 0:
+        return {}
+    if not CONTENT_INDEX_LOCK.acquire(blocking=False):
+        return {}  # Daemon upkeep is updating the index: skip content hits this turn
+    try:
+        hits = get_content_index(docs_root).search(prompt, CONTENT_TOP_K)
+    except Exception as e:
+        print(f"⚠ Content index unavailable: {e}", file=sys.stderr)
+        return {}
+    finally:
+        CONTENT_INDEX_LOCK.release()
+    if not hits or hits[0][1] < CONTENT_MIN_SCORE:
+        return {}
+    best = hits[0][1]
+    return {path: score / best for path, score in hits if score >= CONTENT_MIN_SCORE}
+
+
+def update_attention(state: dict, prompt: str, timer: Optional[PhaseTimer] = None,
+                     content_hits: Optional[Dict[str, float]] = None) -> Tuple[dict, Set[str]]:
     """
     Update attention scores based on prompt content.
     Returns updated state and set of directly activated files.
+
+    Decay is lazy: only activated, co-activated, content-matched and pinned
+    files get a new [score, turn] stamp; everything else is decayed on read.
     """
+    timer = timer or PhaseTimer()
     prompt_lower = prompt.lower()
     directly_activated: Set[str] = set()
+    touch = state["touch"]
+    turn = state.get("turn_count", 0) + 1
+
+    def current(path: str) -> float:
+        entry = touch.get(path)
+        if entry is None:
+            return 0.0
+        return entry[0] * get_decay_rate(path) ** (turn - entry[1])
+
+    def tracked(path: str) -> bool:
+        return path in touch or path in KEYWORD_INDEX.file_ids
+
+    # Phase 1: Decay (implicit, applied on read via the touched turn)
+
+    # Phase 2: Keyword activation (whole-word tokens, or substrings with
+    # "matching": "substring" in keywords.json)
+    # Strength is the noisy-or of the matched keywords' learned weights
+    # (keyword_weights.json), so keywords that never lead to the doc being
+    # used stop forcing it HOT on their own; unweighted keywords count 1.0.
+    strengths: Dict[str, float] = {}
+    for path, matched in KEYWORD_INDEX.matcher.match(prompt_lower).items():
+        strengths[path] = KEYWORD_INDEX.activation(matched)
+        touch[path] = [max(current(path), KEYWORD_BOOST * strengths[path]), turn]
+        directly_activated.add(path)
+    timer.lap("match")
     
-    # Phase 1: Decay all scores
-    for path in state["scores"]:
-        decay = get_decay_rate(path)
-        state["scores"][path] *= decay
-    
-    # Phase 2: Keyword activation (direct mentions)
-    for path, keywords in KEYWORDS.items():
-        if any(kw in prompt_lower for kw in keywords):
-            state["scores"][path] = KEYWORD_BOOST
-            directly_activated.add(path)
-    
-    # Phase 3: Co-activation boost
-    for activated_path in directly_activated:
-        if activated_path in CO_ACTIVATION:
-            for related_path in CO_ACTIVATION[activated_path]:
-                if related_path in state["scores"]:
-                    # Boost but don't exceed 1.0
-                    current = state["scores"][related_path]
-                    state["scores"][related_path] = min(1.0, current + COACTIVATION_BOOST)
+    # Phase 3: Co-activation boost, spread over SPREAD_HOPS hops of the graph
+    # from each activated file with its activation strength (activated files
+    # themselves are not boosted further)
+    spread = KEYWORD_INDEX.spread(
+        strengths, SPREAD_HOPS, SPREAD_ATTENUATION, SPREAD_MIN_BOOST / COACTIVATION_BOOST
+    )
+    for related_path, energy in spread.items():
+        # Boost but don't exceed 1.0
+        touch[related_path] = [min(1.0, current(related_path) + COACTIVATION_BOOST * energy), turn]
+
+    # Phase 3b: Content matches (BM25 over doc text), blended in by CONTENT_WEIGHT
+    for path, relevance in (content_hits or {}).items():
+        if path not in directly_activated and CONTENT_WEIGHT * relevance >= SPREAD_MIN_BOOST:
+            touch[path] = [min(1.0, current(path) + CONTENT_WEIGHT * relevance), turn]
     
     # Phase 4: Pinned file floor
+    floor = WARM_THRESHOLD + 0.1
     for pinned in PINNED_FILES:
-        if pinned in state["scores"]:
-            state["scores"][pinned] = max(state["scores"][pinned], WARM_THRESHOLD + 0.1)
+        if tracked(pinned) and current(pinned) < floor:
+            touch[pinned] = [floor, turn]
+    timer.lap("spread")
     
-    state["turn_count"] = state.get("turn_count", 0) + 1
+    state["turn_count"] = turn
+    state["scores"] = materialize_scores(touch, turn)
+    timer.lap("decay")
     return state, directly_activated
 
 
@@ -507,39 +698,111 @@ def update_attention(state: dict, prompt: str) -> Tuple[dict, Set[str]]:
 # CONTENT EXTRACTION
 # ============================================================================
 
+# Content caches by docs root (persist across turns under the daemon)
+_DOC_CACHES: Dict[Path, DocCache] = {}
+
+
+def get_doc_cache(docs_root: Path) -> DocCache:
+    """Get the mtime-validated content cache for a docs root."""
+    cache = _DOC_CACHES.get(docs_root)
+    if cache is None:
+        manifest = get_docs_manifest(docs_root, refresh=False)
+        cache = _DOC_CACHES[docs_root] = DocCache(docs_root, WARM_HEADER_LINES, manifest)
+    return cache
+
+
 def extract_warm_header(file_path: str, docs_root: Path) -> Optional[str]:
     """
     Extract structured header for warm context.
     Returns first WARM_HEADER_LINES lines, or None if file missing.
     """
-    full_path = docs_root / file_path
-    if not full_path.exists():
-        return None
-    
     try:
-        content = full_path.read_text()
-        lines = content.split('\n')[:WARM_HEADER_LINES]
-        header = '\n'.join(lines)
-        
-        # Add truncation marker if we cut content
-        if len(content.split('\n')) > WARM_HEADER_LINES:
-            header += "\n\n... [WARM: Content truncated, mention to expand] ..."
-        
-        return header
+        return get_doc_cache(docs_root).get_header(file_path)
     except Exception as e:
         return f"[Error reading {file_path}: {e}]"
 
 
 def get_full_content(file_path: str, docs_root: Path) -> Optional[str]:
     """Get full file content for hot context."""
-    full_path = docs_root / file_path
-    if not full_path.exists():
-        return None
-    
     try:
-        return full_path.read_text()
+        entry = get_doc_cache(docs_root).get(file_path)
     except Exception as e:
         return f"[Error reading {file_path}: {e}]"
+    return entry.text if entry else None
+
+
+# ============================================================================
+# CHUNKED ATTENTION
+# Sections of HOT docs get their own [score, turn] stamps in state["sections"],
+# keyed "<path>\x1f<anchor>", and decay at their doc's rate.
+# ============================================================================
+
+def update_section_attention(state: dict, prompt: str, docs_root: Path) -> None:
+    """Activate sections of HOT docs whose terms the prompt mentions; drop dead ones."""
+    if KEYWORD_INDEX.matching == "substring":
+        prompt_lower = prompt.lower()
+        mentions = lambda term: term in prompt_lower
+    else:
+        prompt_tokens = f" {normalize_phrase(prompt)} "
+        mentions = lambda term: f" {normalize_phrase(term)} " in prompt_tokens
+    sections = state.setdefault("sections", {})
+    turn = state["turn_count"]
+    index = get_chunk_index(docs_root)
+    cache = get_doc_cache(docs_root)
+
+    for path, score in state["scores"].items():
+        if score < HOT_THRESHOLD:
+            continue
+        for section in index.sections(path, cache, KEYWORDS.get(path, [])) or []:
+            if any(mentions(term) for term in section.terms):
+                sections[f"{path}{SECTION_SEP}{section.anchor}"] = [KEYWORD_BOOST, turn]
+
+    for key, (score, touched_turn) in list(sections.items()):
+        path = key.split(SECTION_SEP, 1)[0]
+        if path not in state["touch"] or score * get_decay_rate(path) ** (turn - touched_turn) < PRUNE_BELOW:
+            del sections[key]
+
+
+def format_chunked_content(file_path: str, docs_root: Path, state: dict) -> Optional[str]:
+    """
+    HOT body made of the doc's active sections (score >= HOT_THRESHOLD) in
+    full, or its first section if none is active, plus an outline of the rest.
+    """
+    content = get_full_content(file_path, docs_root)
+    sections = get_chunk_index(docs_root).sections(file_path, get_doc_cache(docs_root), KEYWORDS.get(file_path, []))
+    if content is None or not sections or len(sections) < 2:
+        return content
+
+    rate = get_decay_rate(file_path)
+    turn = state["turn_count"]
+    section_touch = state.get("sections", {})
+
+    def active(section) -> bool:
+        entry = section_touch.get(f"{file_path}{SECTION_SEP}{section.anchor}")
+        return entry is not None and entry[0] * rate ** (turn - entry[1]) >= HOT_THRESHOLD
+
+    selected = [s for s in sections if active(s)] or sections[:1]
+    parts = [content[s.start:s.end].rstrip() for s in selected]
+    outline = [
+        f"  {'#' * s.level} {s.heading} ({s.end - s.start:,} chars)"
+        for s in sections if s not in selected
+    ]
+    parts.append(f"[Sections {len(selected)}/{len(sections)} shown; mention one to expand]\n" + "\n".join(outline))
+    return "\n\n".join(parts)
+
+
+def chunk_hot_bodies(sorted_files: List[Tuple[str, float]], docs_root: Path, state: dict) -> Dict[str, str]:
+    """Chunked HOT bodies for HOT-tier candidates (empty unless CHUNK_MODE)."""
+    if not CHUNK_MODE:
+        return {}
+    bodies = {}
+    for file_path, score in sorted_files:
+        if score >= HOT_THRESHOLD:
+            body = format_chunked_content(file_path, docs_root, state)
+            if body is not None:
+                bodies[file_path] = body
+    get_chunk_index(docs_root).save()
+    return bodies
 
 
 # ============================================================================
@@ -555,66 +818,278 @@ def get_tier(score: float) -> str:
     return "COLD"
 
 
-def build_context_output(state: dict, docs_root: Path) -> Tuple[str, dict]:
+def candidate_tier(file_path: str, score: float, policy: Optional[UsefulnessPolicy]) -> str:
+    """Tier of a candidate, one lower if its injections are chronically unused (pinned files exempt)."""
+    tier = get_tier(score)
+    if policy is not None and tier != "COLD" and file_path not in PINNED_FILES and policy.demoted(file_path):
+        return "WARM" if tier == "HOT" else "COLD"
+    return tier
+
+
+def format_hot_block(file_path: str, score: float, content: str) -> str:
+    return f"━━━ [🔥 HOT] {file_path} (score: {score:.2f}) ━━━\n{content}"
+
+
+def format_warm_block(file_path: str, score: float, header: str) -> str:
+    return f"━━━ [🌡️ WARM] {file_path} (score: {score:.2f}) ━━━\n{header}"
+
+
+# Selected blocks are (file_path, score, body) tuples
+Block = Tuple[str, float, str]
+
+
+def select_greedy(sorted_files: List[Tuple[str, float]], docs_root: Path,
+                  hot_bodies: Optional[Dict[str, str]] = None,
+                  policy: Optional[UsefulnessPolicy] = None) -> Tuple[List[Block], List[Block], dict, int]:
     """
-    Build tiered context output respecting limits.
-    Returns (output_string, stats_dict).
+    Fill HOT then WARM in score order against MAX_TOTAL_CHARS.
+    hot_bodies overrides the full text of HOT docs (chunked mode); with a
+    usefulness policy, the order is score x usefulness factor.
+    Returns (hot_blocks, warm_blocks, stats, total_chars).
     """
-    # Sort files by attention score (highest first)
-    sorted_files = sorted(
-        state["scores"].items(),
-        key=lambda x: x[1],
-        reverse=True
-    )
-    
+    hot_bodies = hot_bodies or {}
+    if policy is not None:
+        sorted_files = sorted(sorted_files, key=lambda x: x[1] * policy.factor(x[0]), reverse=True)
     hot_blocks = []
     warm_blocks = []
     stats = {"hot": 0, "warm": 0, "cold": 0}
     total_chars = 0
     
     for file_path, score in sorted_files:
-        tier = get_tier(score)
+        tier = candidate_tier(file_path, score, policy)
         
         if tier == "HOT" and stats["hot"] < MAX_HOT_FILES:
-            content = get_full_content(file_path, docs_root)
+            content = hot_bodies.get(file_path) or get_full_content(file_path, docs_root)
             if content and total_chars + len(content) < MAX_TOTAL_CHARS:
-                hot_blocks.append(f"━━━ [🔥 HOT] {file_path} (score: {score:.2f}) ━━━\n{content}")
+                hot_blocks.append((file_path, score, content))
                 total_chars += len(content)
                 stats["hot"] += 1
             elif content:
                 # Demote to warm if would exceed char limit
                 header = extract_warm_header(file_path, docs_root)
                 if header:
-                    warm_blocks.append(f"━━━ [🌡️ WARM] {file_path} (score: {score:.2f}) ━━━\n{header}")
+                    warm_blocks.append((file_path, score, header))
                     total_chars += len(header)
                     stats["warm"] += 1
                     
         elif tier == "WARM" and stats["warm"] < MAX_WARM_FILES:
             header = extract_warm_header(file_path, docs_root)
             if header and total_chars + len(header) < MAX_TOTAL_CHARS:
-                warm_blocks.append(f"━━━ [🌡️ WARM] {file_path} (score: {score:.2f}) ━━━\n{header}")
+                warm_blocks.append((file_path, score, header))
                 total_chars += len(header)
                 stats["warm"] += 1
                 
         else:
             stats["cold"] += 1
-    
+
+    return hot_blocks, warm_blocks, stats, total_chars
+
+
+def select_knapsack(sorted_files: List[Tuple[str, float]], docs_root: Path,
+                    hot_bodies: Optional[Dict[str, str]] = None,
+                    policy: Optional[UsefulnessPolicy] = None) -> Tuple[List[Block], List[Block], dict, int]:
+    """
+    Pick the (file, tier) set maximizing total attention score within
+    MAX_TOTAL_TOKENS, using cached per-doc token estimates.
+    hot_bodies overrides the full text of HOT docs (chunked mode); with a
+    usefulness policy, each doc's value is its score x usefulness factor.
+    Returns (hot_blocks, warm_blocks, stats, total_chars); stats["tokens"] is the estimate used.
+    """
+    hot_bodies = hot_bodies or {}
+    cache = get_doc_cache(docs_root)
+    candidates = []
+    for file_path, score in sorted_files:
+        tier = candidate_tier(file_path, score, policy)
+        if tier == "COLD":
+            continue
+        try:
+            warm_tokens = cache.get_header_tokens(file_path)
+            if tier != "HOT":
+                hot_tokens = None
+            elif file_path in hot_bodies:
+                hot_tokens = estimate_tokens(hot_bodies[file_path])
+            else:
+                hot_tokens = cache.get_tokens(file_path)
+        except Exception:
+            continue  # Unreadable doc: never selected
+        if warm_tokens is None and hot_tokens is None:
+            continue
+        candidates.append(PackCandidate(
+            file_path,
+            score * policy.factor(file_path) if policy is not None else score,
+            hot_tokens + BLOCK_OVERHEAD_TOKENS if hot_tokens is not None else None,
+            warm_tokens + BLOCK_OVERHEAD_TOKENS if warm_tokens is not None else None,
+        ))
+
+    selection = pack(candidates, MAX_TOTAL_TOKENS, MAX_HOT_FILES, MAX_WARM_FILES)
+    # Full text only for the HOT docs selected (candidates were sized from cached estimates)
+    cache.prefetch([f for f, tier in selection.items() if tier == "HOT" and f not in hot_bodies], [])
+
+    hot_blocks = []
+    warm_blocks = []
+    stats = {"hot": 0, "warm": 0, "cold": 0, "tokens": 0}
+    total_chars = 0
+    tokens_by_file = {c.file: c for c in candidates}
+
+    for file_path, score in sorted_files:
+        tier = selection.get(file_path)
+        # A doc removed between sizing and reading has no body: count it COLD
+        body = None
+        if tier == "HOT":
+            body = hot_bodies.get(file_path) or get_full_content(file_path, docs_root)
+        elif tier == "WARM":
+            body = extract_warm_header(file_path, docs_root)
+        if body is None:
+            stats["cold"] += 1
+        elif tier == "HOT":
+            hot_blocks.append((file_path, score, body))
+            total_chars += len(body)
+            stats["tokens"] += tokens_by_file[file_path].hot_tokens
+            stats["hot"] += 1
+        else:
+            warm_blocks.append((file_path, score, body))
+            total_chars += len(body)
+            stats["tokens"] += tokens_by_file[file_path].warm_tokens
+            stats["warm"] += 1
+
+    return hot_blocks, warm_blocks, stats, total_chars
+
+
+def format_blocks(hot_blocks: List[Block], warm_blocks: List[Block], ledger: Optional[InjectionLedger], stats: dict) -> List[str]:
+    """
+    Render selected blocks. With a ledger (delta mode), blocks whose identical
+    body is still in the conversation collapse to a one-line marker.
+    Records each block (file, tier, score, body hash) in stats["blocks"].
+    """
+    if ledger is not None:
+        ledger.begin_turn()
+
+    rendered = []
+    stats["blocks"] = []
+    for tier, blocks, fmt in (("HOT", hot_blocks, format_hot_block), ("WARM", warm_blocks, format_warm_block)):
+        for file_path, score, body in blocks:
+            stats["blocks"].append({
+                "file": file_path,
+                "tier": tier,
+                "score": round(score, 4),
+                "hash": block_hash(tier, body),
+                "chars": len(body),
+            })
+            turns_ago = ledger.check(file_path, tier, body) if ledger is not None else None
+            if turns_ago is not None:
+                body = f"[unchanged, still active from {turns_ago} turn(s) ago]"
+                stats["unchanged"] = stats.get("unchanged", 0) + 1
+            rendered.append(fmt(file_path, score, body))
+
+    if ledger is not None:
+        ledger.prune()
+    return rendered
+
+
+def prefetch_candidates(sorted_files: List[Tuple[str, float]], docs_root: Path, capped: bool,
+                        policy: Optional[UsefulnessPolicy] = None) -> None:
+    """
+    Read candidate docs concurrently before selection. With capped (greedy
+    fill): full text for the first MAX_HOT_FILES HOT candidates and headers
+    for the first MAX_WARM_FILES WARM ones, which is all greedy reads unless
+    blocks are rejected for size. Otherwise (knapsack): headers for every
+    candidate and token estimates for HOT ones; select_knapsack() reads the
+    full text of the HOT docs it picks.
+    """
+    tiers = [(path, candidate_tier(path, score, policy)) for path, score in sorted_files]
+    hot = [path for path, tier in tiers if tier == "HOT"]
+    warm = [path for path, tier in tiers if tier == "WARM"]
+    if capped:
+        get_doc_cache(docs_root).prefetch(hot[:MAX_HOT_FILES], warm[:MAX_WARM_FILES])
+    else:
+        get_doc_cache(docs_root).prefetch([], warm, tokens=hot)
+
+
+def rank_candidates(scores: Dict[str, float], limit: int = 0) -> Tuple[List[Tuple[str, float]], int]:
+    """
+    Files at or above WARM_THRESHOLD, highest score first (optionally top `limit`).
+    Returns (ranked, number of remaining COLD files).
+    """
+    engine = get_engine()
+    if engine is not None:
+        engine.load(scores)
+        return engine.ranked(WARM_THRESHOLD, limit)
+
+    ranked = sorted(
+        ((path, score) for path, score in scores.items() if score >= WARM_THRESHOLD),
+        key=lambda x: x[1],
+        reverse=True
+    )
+    if limit:
+        ranked = ranked[:limit]
+    return ranked, len(scores) - len(ranked)
+
+
+def build_context_output(state: dict, docs_root: Path, ledger: Optional[InjectionLedger] = None,
+                         timer: Optional[PhaseTimer] = None) -> Tuple[str, dict]:
+    """
+    Build tiered context output respecting limits.
+    Returns (output_string, stats_dict).
+
+    With a ledger (delta mode), unchanged blocks already injected in this
+    session are replaced by a "still active" marker.
+    """
+    # HOT/WARM candidates by attention score (highest first); the rest are COLD
+    # Reads for all candidates are issued concurrently, then blocks are
+    # assembled in score order from the cache
+    timer = timer or PhaseTimer()
+    policy = get_usefulness_policy(docs_root) if USEFULNESS_MODE else None
+    if PACKING_MODE == "knapsack":
+        sorted_files, cold_count = rank_candidates(state["scores"], MAX_PACK_CANDIDATES)
+        timer.lap("rank")
+        prefetch_candidates(sorted_files, docs_root, capped=False, policy=policy)
+        hot_blocks, warm_blocks, stats, total_chars = select_knapsack(
+            sorted_files, docs_root, chunk_hot_bodies(sorted_files, docs_root, state), policy
+        )
+    else:
+        sorted_files, cold_count = rank_candidates(state["scores"])
+        timer.lap("rank")
+        prefetch_candidates(sorted_files, docs_root, capped=True, policy=policy)
+        hot_blocks, warm_blocks, stats, total_chars = select_greedy(
+            sorted_files, docs_root, chunk_hot_bodies(sorted_files, docs_root, state), policy
+        )
+    if policy is not None:
+        stats["demoted"] = sum(
+            1 for path, score in sorted_files if candidate_tier(path, score, policy) != get_tier(score)
+        )
+    # Keyword files not tracked in state (decayed out or never touched) are COLD too
+    stats["cold"] += cold_count + len(KEYWORDS) - sum(1 for p in state["scores"] if p in KEYWORDS)
+
+    # Persist warm headers computed this turn
+    get_doc_cache(docs_root).flush()
+    timer.lap("read")
+
+    # Render blocks first (delta mode counts unchanged blocks for the header)
+    blocks = format_blocks(hot_blocks, warm_blocks, ledger, stats)
+
     # Combine output
     output_parts = []
     
     # Status header
     output_parts.append(f"╔══ ATTENTION STATE [Turn {state['turn_count']}] ══╗")
     output_parts.append(f"║ 🔥 Hot: {stats['hot']} │ 🌡️ Warm: {stats['warm']} │ ❄️ Cold: {stats['cold']} ║")
-    output_parts.append(f"║ Total chars: {total_chars:,} / {MAX_TOTAL_CHARS:,} ║")
+    if "tokens" in stats:
+        # Knapsack mode budgets tokens, not chars
+        output_parts.append(f"║ Est. tokens: {stats['tokens']:,} / {MAX_TOTAL_TOKENS:,} ║")
+    else:
+        output_parts.append(f"║ Total chars: {total_chars:,} / {MAX_TOTAL_CHARS:,} ║")
+    if stats.get("unchanged"):
+        output_parts.append(f"║ Unchanged (delta): {stats['unchanged']} ║")
+    if stats.get("demoted"):
+        output_parts.append(f"║ Demoted (unused): {stats['demoted']} ║")
     output_parts.append("╚" + "═" * 38 + "╝")
     
-    # Hot files first (most relevant)
-    output_parts.extend(hot_blocks)
-    
-    # Then warm files
-    output_parts.extend(warm_blocks)
+    # Hot files first (most relevant), then warm files
+    output_parts.extend(blocks)
     
-    return "\n\n".join(output_parts), stats
+    output = "\n\n".join(output_parts)
+    timer.lap("format")
+    return output, stats
 
 
 # ============================================================================
@@ -641,8 +1116,9 @@ def compute_transitions(prev_state: dict, curr_state: dict) -> dict:
     return transitions
 
 
-def append_history(state: dict, prev_state: dict, activated: Set[str], prompt: str, stats: dict):
-    """Append structured entry to history log."""
+def append_history(state: dict, prev_state: dict, activated: Set[str], prompt: str, stats: dict,
+                   timings_ns: Optional[Dict[str, int]] = None):
+    """Append structured entry to history log (with per-phase timings, if given)."""
 
     # Extract keywords from prompt (simple: first 8 significant words)
     stop_words = {"the", "a", "an", "is", "are", "to", "for", "and", "or", "in", "on", "it", "this", "that", "with", "of"}
@@ -660,19 +1136,308 @@ def append_history(state: dict, prev_state: dict, activated: Set[str], prompt: s
         "transitions": compute_transitions(prev_state, state),
         "total_chars": stats.get("total_chars", 0)
     }
+    if timings_ns:
+        entry["timings_ns"] = timings_ns
 
     try:
-        # Ensure history file exists
-        if not HISTORY_FILE.exists():
-            HISTORY_FILE.parent.mkdir(exist_ok=True)
-            HISTORY_FILE.touch()
-
-        with open(HISTORY_FILE, "a") as f:
-            f.write(json.dumps(entry) + "\n")
+        append_entry(entry)
     except Exception:
         pass  # Don't fail hook on history write error
 
 
+# ============================================================================
+# ROUTING TURN
+# ============================================================================
+
+def parse_hook_input(raw: str) -> dict:
+    """
+    Parse hook stdin (JSON with "prompt", "session_id", ...).
+    Falls back to treating the raw text as the prompt.
+    """
+    try:
+        input_data = json.loads(raw)
+        if isinstance(input_data, dict):
+            return input_data
+    except json.JSONDecodeError:
+        pass
+    # Fallback: treat entire stdin as prompt
+    return {"prompt": raw}
+
+
+def get_session_id(input_data: dict) -> str:
+    """Session key for per-session bookkeeping (hook session_id, else instance)."""
+    return input_data.get("session_id") or os.environ.get("CLAUDE_INSTANCE", "default")
+
+
+def log_injection(state: dict, prompt: str, output: str, stats: dict, activated: Set[str], session_id: str) -> None:
+    """
+    Append a structured record of this turn to the rotating injection log.
+    Blocks are logged by hash; the full output only on sampled/debug turns.
+    """
+    now = datetime.now()
+    record = {
+        "ts": now.isoformat(),
+        "ts_epoch": now.timestamp(),
+        "turn": state["turn_count"],
+        "instance": os.environ.get("CLAUDE_INSTANCE", "default"),
+        "session": session_id,
+        "prompt": prompt[:100],
+        "stats": {k: stats.get(k, 0) for k in ("hot", "warm", "cold", "unchanged", "total_chars")},
+        "activated": sorted(activated),
+        "blocks": stats.get("blocks", []),
+    }
+    if sample_bodies():
+        record["output"] = output
+    append_record(record)
+
+
+def queue_usage(state: dict, stats: dict, session_id: str) -> None:
+    """Queue this turn's injected files for the usage tracker's Stop hook (one append)."""
+    if not USAGE_TRACKING_AVAILABLE or not stats.get("blocks"):
+        return
+    queue_injection({
+        "session_id": session_id,
+        "turn": state["turn_count"],
+        "timestamp": datetime.now().isoformat(),
+        "injected_files": [
+            {"file": b["file"], "tier": b["tier"], "score": b["score"], "chars": b["chars"]}
+            for b in stats["blocks"]
+        ],
+    })
+
+
+def route_prompt(prompt: str, docs_root: Path, state_file: Path, prev_state: dict, session_id: str = "default",
+                 timer: Optional[PhaseTimer] = None) -> Tuple[Optional[str], dict]:
+    """
+    Run one routing turn: update attention, build context, record history and state.
+    Returns (output or None if nothing to inject, new state).
+
+    Shared by the one-shot hook and the daemon; prev_state is left untouched.
+    Phase timings go to the history entry and the metrics log.
+    """
+    timer = timer or PhaseTimer()
+
+    # Copy for modification: touch entries are replaced, never mutated, so a
+    # shallow copy of the map keeps prev_state intact for the tier diff
+    state = dict(prev_state, touch=dict(prev_state["touch"]), sections=dict(prev_state.get("sections", {})))
+    timer.lap("state_load")
+
+    # Update attention based on prompt (keywords, co-activation, doc content)
+    content_hits = get_content_hits(prompt, docs_root)
+    timer.lap("content")
+    state, activated = update_attention(state, prompt, timer, content_hits)
+    if CHUNK_MODE:
+        update_section_attention(state, prompt, docs_root)
+        timer.lap("sections")
+
+    # Build output (delta mode: skip bodies this session already has)
+    ledger = InjectionLedger(get_ledger_path(get_state_dir(), session_id)) if DELTA_MODE else None
+    timer.lap("state_load")
+    output, stats = build_context_output(state, docs_root, ledger, timer)
+    stats["total_chars"] = len(output)  # Add total chars to stats
+
+    # Save state for next turn
+    if ledger is not None:
+        ledger.save()
+    save_state(state_file, state)
+    timer.lap("save")
+
+    # Log injection (rotating, compressed; block hashes unless sampled) and
+    # queue it for the usage tracker
+    log_injection(state, prompt, output, stats, activated, session_id)
+    queue_usage(state, stats, session_id)
+    timer.lap("log")
+
+    # Append to history log (last, so the entry carries every earlier phase)
+    append_history(state, prev_state, activated, prompt, stats, timer.snapshot())
+    timer.lap("history")
+    append_metrics({
+        "ts": datetime.now().isoformat(),
+        "turn": state["turn_count"],
+        "instance": os.environ.get("CLAUDE_INSTANCE", "default"),
+        "session": session_id,
+        "timings_ns": timer.snapshot(),
+    })
+
+    if stats["hot"] > 0 or stats["warm"] > 0:
+        return output, state
+    return None, state
+
+
+# ============================================================================
+# ROUTER DAEMON
+# Long-lived server on a per-project Unix socket. Keeps keyword tables, the
+# co-activation graph, docs root, doc content cache and attention state in
+# memory between turns; context-router-client.py forwards each prompt here.
+# ============================================================================
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _config_signature() -> tuple:
+    """Signature of every keywords.json location load_keyword_config() checks, and its learned weights."""
+    return tuple(
+        (_file_signature(p), _file_signature(get_weights_path(p))) for p in KEYWORD_CONFIG_PATHS
+    )
+
+
+class RouterDaemon:
+    """Serve routing turns for one project directory."""
+
+    def __init__(self, socket_path: Path, idle_timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.cwd = os.getcwd()
+        self.docs_root_env = os.getenv("CONTEXT_DOCS_ROOT")
+
+        self.docs_root = resolve_docs_root()
+        validate_keyword_docs(self.docs_root)
+        self.config_signature = _config_signature()
+        # Per-instance state: shard path -> (state, shard signature when loaded/saved)
+        self.states: Dict[Path, Tuple[dict, Optional[Tuple[int, int]]]] = {}
+        self.upkeep: Optional[threading.Thread] = None
+
+    def load_instance_state(self, state_file: Path) -> dict:
+        """An instance's state, reloaded if its shard was written by another process."""
+        signature = _file_signature(state_file)
+        cached = self.states.get(state_file)
+        if cached is not None and cached[1] == signature:
+            return cached[0]
+        state = load_state(state_file)
+        self.states[state_file] = (state, signature)
+        return state
+
+    def refresh(self, timer: PhaseTimer) -> None:
+        """Pick up doc tree changes and keywords.json edits."""
+        global KEYWORD_INDEX, KEYWORDS, CO_ACTIVATION
+
+        get_docs_manifest(self.docs_root)
+        timer.lap("docs_root")
+
+        signature = _config_signature()
+        if signature != self.config_signature:
+            KEYWORD_INDEX = load_keyword_config()
+            KEYWORDS, CO_ACTIVATION = KEYWORD_INDEX.keywords, KEYWORD_INDEX.co_activation
+            self.config_signature = signature
+            validate_keyword_docs(self.docs_root)
+        timer.lap("config")
+
+    def handle(self, request: dict) -> dict:
+        """Route one forwarded hook invocation."""
+        env = request.get("env", {})
+        if request.get("cwd") != self.cwd:
+            return {"error": f"daemon serves {self.cwd}"}
+        if env.get("CONTEXT_DOCS_ROOT") != self.docs_root_env:
+            return {"error": "CONTEXT_DOCS_ROOT differs from daemon"}
+
+        input_data = parse_hook_input(request.get("input", ""))
+        prompt = input_data.get("prompt", "")
+        if not prompt.strip():
+            return {"output": ""}
+
+        if "CLAUDE_INSTANCE" in env:
+            os.environ["CLAUDE_INSTANCE"] = env["CLAUDE_INSTANCE"]
+        else:
+            os.environ.pop("CLAUDE_INSTANCE", None)
+
+        timer = PhaseTimer()
+        self.refresh(timer)
+        state_file = get_state_file(get_instance_id(input_data))
+        prev_state = self.load_instance_state(state_file)
+        timer.lap("state_load")
+        output, state = route_prompt(
+            prompt, self.docs_root, state_file, prev_state, get_session_id(input_data), timer
+        )
+        self.states[state_file] = (state, _file_signature(state_file))
+        return {"output": output or ""}
+
+    def maintain(self) -> None:
+        """Upkeep between turns; runs on the upkeep thread, never on a prompt."""
+        try:
+            compact_if_due()
+        except Exception as e:
+            print(f"⚠ History compaction failed: {e}", file=sys.stderr)
+        if CONTENT_WEIGHT > 0:
+            with CONTENT_INDEX_LOCK:
+                try:
+                    # The prompt path keeps the docs manifest fresh; don't race it
+                    maintain_content_index(self.docs_root, refresh_manifest=False)
+                except Exception as e:
+                    print(f"⚠ Content index maintenance failed: {e}", file=sys.stderr)
+
+    def start_upkeep(self) -> None:
+        """Run maintain() in the background, unless the previous run is still going."""
+        if self.upkeep is not None and self.upkeep.is_alive():
+            return
+        self.upkeep = threading.Thread(target=self.maintain, name="router-upkeep", daemon=True)
+        self.upkeep.start()
+
+    def _claim_socket(self) -> None:
+        """Remove a stale socket file, refusing to start if a daemon is live."""
+        if not self.socket_path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            self.socket_path.unlink()
+        else:
+            raise RuntimeError(f"router daemon already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def serve(self) -> None:
+        """Accept connections until idle timeout or SIGTERM/SIGINT."""
+        self._claim_socket()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Create the socket owner-only from the start (no window with default permissions)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(str(self.socket_path))
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        server.settimeout(self.idle_timeout)
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        print(f"ℹ Router daemon listening on {self.socket_path}", file=sys.stderr)
+
+        try:
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    print("ℹ Router daemon idle timeout, exiting", file=sys.stderr)
+                    return
+                with conn:
+                    conn.settimeout(REPLY_TIMEOUT)
+                    try:
+                        request = read_message(conn)
+                    except (OSError, ValueError, ConnectionError):
+                        continue
+                    try:
+                        reply = self.handle(request)
+                    except Exception as e:
+                        # Client falls back to in-process routing on error
+                        reply = {"error": f"{type(e).__name__}: {e}"}
+                    try:
+                        write_message(conn, reply)
+                    except OSError:
+                        pass
+                self.start_upkeep()
+        finally:
+            server.close()
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+
+
 # ============================================================================
 # MAIN ENTRY POINT
 # ============================================================================
@@ -681,61 +1446,44 @@ def main():
     """
     Main entry point for Claude Code hook.
     Reads JSON from stdin, outputs tiered context to stdout.
+
+    With --serve, runs the long-lived router daemon instead.
     """
+    if "--serve" in sys.argv[1:]:
+        idle_timeout = None
+        if "--idle-timeout" in sys.argv:
+            idle_timeout = float(sys.argv[sys.argv.index("--idle-timeout") + 1])
+        RouterDaemon(get_socket_path(), idle_timeout).serve()
+        return
+
     # Parse input
-    try:
-        input_data = json.loads(sys.stdin.read())
-        prompt = input_data.get("prompt", "")
-    except json.JSONDecodeError:
-        # Fallback: treat entire stdin as prompt
-        prompt = sys.stdin.read() if sys.stdin else ""
-    
+    input_data = parse_hook_input(sys.stdin.read())
+    prompt = input_data.get("prompt", "")
+
     if not prompt.strip():
         return
 
+    # Per-phase timings (the keyword index was loaded at import)
+    timer = PhaseTimer()
+    timer.add("config", CONFIG_LOAD_NS)
+
     # Determine docs root with proper priority order
     # Priority 1: Explicit CONTEXT_DOCS_ROOT environment variable
     # Priority 2: Project-local .claude/ (if exists with .md files)
     # Priority 3: Global ~/.claude/
     docs_root = resolve_docs_root()
+    validate_keyword_docs(docs_root)
+    timer.lap("docs_root")
 
-    # Load state
-    state_file = get_state_file()
-    prev_state = load_state(state_file)  # Keep copy before mutation
-    state = json.loads(json.dumps(prev_state))  # Deep copy for modification
-
-    # Update attention based on prompt
-    state, activated = update_attention(state, prompt)
-
-    # Build output
-    output, stats = build_context_output(state, docs_root)
-    stats["total_chars"] = len(output)  # Add total chars to stats
-
-    # Append to history log (before save, so turn_count is correct)
-    append_history(state, prev_state, activated, prompt, stats)
+    # Load this instance's state shard
+    state_file = get_state_file(get_instance_id(input_data))
+    prev_state = load_state(state_file)
+    timer.lap("state_load")
 
-    # Save state for next turn
-    save_state(state_file, state)
-    
-    # Log injection for debugging (append-only)
-    log_file = Path.home() / ".claude" / "context_injection.log"
-    try:
-        with open(log_file, "a") as f:
-            f.write(f"\n{'='*80}\n")
-            f.write(f"[{datetime.now().isoformat()}] Turn {state['turn_count']}\n")
-            f.write(f"Prompt (first 100 chars): {prompt[:100]}...\n")
-            f.write(f"Stats: Hot={stats['hot']}, Warm={stats['warm']}, Cold={stats['cold']}\n")
-            f.write(f"Total chars: {len(output):,}\n")
-            f.write(f"Activated files: {', '.join(activated) if activated else 'none'}\n")
-            f.write(f"{'='*80}\n")
-            f.write(output)
-            f.write(f"\n{'='*80}\n\n")
-    except Exception as e:
-        # Don't fail hook if logging fails
-        pass
+    output, _ = route_prompt(prompt, docs_root, state_file, prev_state, get_session_id(input_data), timer)
 
     # Output to Claude Code
-    if stats["hot"] > 0 or stats["warm"] > 0:
+    if output:
         print(output)
 
 
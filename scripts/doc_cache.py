@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Doc Cache - mtime-validated document content for HOT/WARM injection
+
+Keeps each doc's full text, its precomputed warm header and its char length,
+validated by (st_mtime_ns, st_size). An unchanged doc is never re-read or
+re-split. In one-shot mode the cache lives for a single turn; under the router
+daemon it persists across turns, so the same HOT docs are read once.
+
+Warm headers are read by streaming only the first lines of a doc. Headers
+and full-text token estimates are persisted in the docs manifest, so docs
+that are only sized (knapsack candidates) or shown WARM are not opened at
+all until they change.
+
+prefetch() issues a turn's reads concurrently from a small thread pool, so
+slow filesystems (network homes, encrypted volumes) pay roughly one read
+latency per turn instead of one per doc.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from budget_packer import estimate_tokens
+from docs_manifest import DocsManifest
+
+WARM_TRUNCATION_MARKER = "\n\n... [WARM: Content truncated, mention to expand] ..."
+PREFETCH_WORKERS = 8   # Concurrent doc reads in prefetch()
+
+
+def build_warm_header(content: str, header_lines: int) -> str:
+    """First header_lines lines, plus a truncation marker if content was cut."""
+    lines = content.split('\n')
+    header = '\n'.join(lines[:header_lines])
+    if len(lines) > header_lines:
+        header += WARM_TRUNCATION_MARKER
+    return header
+
+
+def read_warm_header(path: Path, header_lines: int) -> str:
+    """
+    Streaming equivalent of build_warm_header(path.read_text(), header_lines).
+    Reads header_lines lines plus one lookahead line to decide on truncation.
+    """
+    if header_lines <= 0:
+        return WARM_TRUNCATION_MARKER
+
+    with open(path) as f:
+        lines = list(islice(f, header_lines + 1))
+
+    head = lines[:header_lines]
+    header = ''.join(head)
+    # split('\n') counts a trailing newline as one more (empty) line
+    truncated = len(lines) > header_lines or (
+        len(head) == header_lines and head[-1].endswith('\n')
+    )
+    if len(head) == header_lines and header.endswith('\n'):
+        header = header[:-1]
+    if truncated:
+        header += WARM_TRUNCATION_MARKER
+    return header
+
+
+class DocEntry:
+    """Cached content of one doc at a given (mtime_ns, size); fields fill lazily."""
+
+    __slots__ = ("signature", "text", "warm_header", "chars", "tokens", "header_tokens")
+
+    def __init__(self, signature: Tuple[int, int]):
+        self.signature = signature
+        self.text: Optional[str] = None
+        self.warm_header: Optional[str] = None
+        self.chars: Optional[int] = None
+        self.tokens: Optional[int] = None         # Estimated tokens of full text
+        self.header_tokens: Optional[int] = None  # Estimated tokens of warm header
+
+
+class DocCache:
+    """Per-docs-root content cache."""
+
+    def __init__(self, docs_root: Path, header_lines: int, manifest: Optional[DocsManifest] = None):
+        self.docs_root = docs_root
+        self.header_lines = header_lines
+        self.manifest = manifest  # Docs absent from the manifest are skipped without a stat
+        self._entries: Dict[str, DocEntry] = {}
+
+    def _entry(self, file_path: str) -> Optional[DocEntry]:
+        """Current entry for a doc (reset if the file changed), or None if missing."""
+        if self.manifest is not None and file_path not in self.manifest:
+            self._entries.pop(file_path, None)
+            return None
+
+        try:
+            st = (self.docs_root / file_path).stat()
+        except OSError:
+            self._entries.pop(file_path, None)
+            return None
+
+        signature = (st.st_mtime_ns, st.st_size)
+        entry = self._entries.get(file_path)
+        if entry is None or entry.signature != signature:
+            entry = self._entries[file_path] = DocEntry(signature)
+        return entry
+
+    def signature(self, file_path: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of a doc without reading it, or None if missing."""
+        entry = self._entry(file_path)
+        return entry.signature if entry else None
+
+    def get(self, file_path: str) -> Optional[DocEntry]:
+        """
+        Return the entry for a doc with full text loaded.
+        Returns None if the file is missing; raises OSError/UnicodeError on read failure.
+        """
+        entry = self._entry(file_path)
+        if entry is None:
+            return None
+        if entry.text is None:
+            entry.text = (self.docs_root / file_path).read_text()
+            entry.chars = len(entry.text)
+            if entry.warm_header is None:
+                entry.warm_header = build_warm_header(entry.text, self.header_lines)
+        return entry
+
+    def get_header(self, file_path: str) -> Optional[str]:
+        """
+        Return a doc's warm header without reading the whole file.
+        Returns None if the file is missing; raises OSError/UnicodeError on read failure.
+        """
+        entry = self._entry(file_path)
+        if entry is None:
+            return None
+        if entry.warm_header is None and self.manifest is not None:
+            entry.warm_header = self.manifest.get_header(file_path, entry.signature, self.header_lines)
+        if entry.warm_header is None:
+            entry.warm_header = read_warm_header(self.docs_root / file_path, self.header_lines)
+            if self.manifest is not None:
+                self.manifest.put_header(file_path, entry.signature, self.header_lines, entry.warm_header)
+        return entry.warm_header
+
+    def get_tokens(self, file_path: str) -> Optional[int]:
+        """
+        Estimated tokens of a doc's full text (cached per doc version, and
+        persisted via the manifest). Reads the doc only if no estimate is
+        recorded, without keeping its text.
+        """
+        entry = self._entry(file_path)
+        if entry is None:
+            return None
+        if entry.tokens is None and self.manifest is not None:
+            entry.tokens = self.manifest.get_tokens(file_path, entry.signature)
+        if entry.tokens is None:
+            text = entry.text if entry.text is not None else (self.docs_root / file_path).read_text()
+            entry.tokens = estimate_tokens(text)
+            if self.manifest is not None:
+                self.manifest.put_tokens(file_path, entry.signature, entry.tokens)
+            if entry.warm_header is None:
+                entry.warm_header = build_warm_header(text, self.header_lines)
+                if self.manifest is not None:
+                    self.manifest.put_header(file_path, entry.signature, self.header_lines, entry.warm_header)
+        return entry.tokens
+
+    def get_header_tokens(self, file_path: str) -> Optional[int]:
+        """Estimated tokens of a doc's warm header (cached per doc version)."""
+        header = self.get_header(file_path)
+        if header is None:
+            return None
+        entry = self._entries[file_path]
+        if entry.header_tokens is None:
+            entry.header_tokens = estimate_tokens(header)
+        return entry.header_tokens
+
+    def _size(self, file_path: str) -> None:
+        """Token estimate and warm header of a doc (what knapsack sizing needs)."""
+        if self.get_tokens(file_path) is not None:
+            self.get_header(file_path)
+
+    def prefetch(self, full: Iterable[str], headers: Iterable[str], tokens: Iterable[str] = (),
+                 workers: int = PREFETCH_WORKERS) -> None:
+        """
+        Concurrently load full text for `full` docs, warm headers for
+        `headers` docs, and token estimates plus warm headers for `tokens`
+        docs, so the sequential selection that follows hits the cache. Each
+        path is loaded by one task only (concurrent tasks on one path would
+        replace each other's entry). Read errors are left for that selection
+        to report.
+        """
+        tasks = {}
+        for load, paths in ((self.get_header, headers), (self._size, tokens), (self.get, full)):
+            for path in paths:
+                tasks[path] = load  # Later (more complete) loads win
+        tasks = [(load, path) for path, load in tasks.items()]
+        if len(tasks) < 2:
+            return
+
+        def run(task) -> None:
+            load, path = task
+            try:
+                load(path)
+            except Exception:
+                pass
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            list(pool.map(run, tasks))
+
+    def flush(self) -> None:
+        """Persist newly computed headers and token estimates (via the manifest)."""
+        if self.manifest is not None:
+            self.manifest.save()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Docs Manifest - persisted list of .md docs under a docs root
+
+Replaces recursive `glob("**/*.md")` walks. The manifest records every doc's
+(mtime_ns, size) and every directory's mtime; a refresh only stats known
+directories and re-lists the ones whose mtime changed, so an unchanged tree
+costs one stat per directory instead of a full walk.
+
+Stored at <docs_root>/.cache/docs_manifest.json. Shared by docs-root
+resolution, keyword validation and missing-file checks. Also carries each
+doc's precomputed warm header and full-text token estimate, keyed by the
+doc's (mtime_ns, size).
+
+The router's own state directories under the root are never scanned, and a
+directory whose mtime changed without any doc or subdirectory changing
+(temp files, renames of non-docs) is re-listed in memory but doesn't
+rewrite the manifest. docs_stamp changes only when docs are added or
+removed, for consumers that sync against the doc set.
+"""
+
+import json
+import os
+import stat
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MANIFEST_VERSION = 2
+CACHE_DIRNAME = ".cache"   # Sidecar cache directory, never scanned for docs
+MANIFEST_FILENAME = "docs_manifest.json"
+# Directories at the root the hooks write every turn (caches, state shards,
+# usage queue); they never hold docs
+STATE_DIRNAMES = {CACHE_DIRNAME, "attn_state", "usage_pending"}
+MAX_LINK_DEPTH = 16        # Don't follow directory symlinks deeper than this
+
+
+def _parent(rel_path: str) -> str:
+    return rel_path.rpartition("/")[0]
+
+
+class DocsManifest:
+    """Doc paths (relative to root, '/'-separated) with stat info."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.path = root / CACHE_DIRNAME / MANIFEST_FILENAME
+        self.dirs: Dict[str, int] = {}          # rel dir ("" = root) -> mtime_ns
+        self.docs: Dict[str, List[int]] = {}    # rel doc path -> [mtime_ns, size]
+        self.headers: Dict[str, list] = {}      # rel doc path -> [mtime_ns, size, lines, header]
+        self.tokens: Dict[str, List[int]] = {}  # rel doc path -> [mtime_ns, size, est. tokens]
+        self.docs_stamp = 0                     # Changes whenever docs are added or removed
+        self._by_dir: Dict[str, Set[str]] = {}  # rel dir -> doc paths directly inside
+        self._dirty = False
+
+    # ------------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, root: Path) -> "DocsManifest":
+        """Load the persisted manifest (empty if missing, stale or corrupt)."""
+        manifest = cls(root)
+        try:
+            data = json.loads(manifest.path.read_text())
+            if data.get("version") == MANIFEST_VERSION and data.get("root") == str(root):
+                manifest.dirs = data["dirs"]
+                manifest.docs = data["docs"]
+                manifest.headers = data.get("headers", {})
+                manifest.tokens = data.get("tokens", {})
+                manifest.docs_stamp = data.get("docs_stamp", 0)
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        for doc in manifest.docs:
+            manifest._by_dir.setdefault(_parent(doc), set()).add(doc)
+        return manifest
+
+    def save(self) -> None:
+        """Atomically persist the manifest if it changed."""
+        if not self._dirty:
+            return
+        data = {
+            "version": MANIFEST_VERSION,
+            "root": str(self.root),
+            "dirs": self.dirs,
+            "docs": self.docs,
+            "headers": self.headers,
+            "tokens": self.tokens,
+            "docs_stamp": self.docs_stamp,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(data))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            pass  # Read-only docs root: manifest still works in memory
+
+    # ------------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------------
+
+    def refresh(self) -> bool:
+        """
+        Bring the manifest up to date with the filesystem.
+        Returns True if anything changed.
+        """
+        changed = False
+        if not self.dirs:
+            self._scan_dir("")
+            return self._dirty
+
+        for rel_dir, mtime_ns in list(self.dirs.items()):
+            if rel_dir not in self.dirs:
+                continue  # Dropped as a descendant of a vanished dir
+            abs_dir = self.root / rel_dir if rel_dir else self.root
+            try:
+                current = os.stat(abs_dir).st_mtime_ns
+            except OSError:
+                self._drop_dir(rel_dir)
+                changed = True
+                continue
+            if current != mtime_ns:
+                self._scan_dir(rel_dir)
+                changed = True
+        return changed
+
+    def _scan_dir(self, rel_dir: str) -> None:
+        """List one directory: its mtime, the docs directly in it, and any new subdirs."""
+        abs_dir = self.root / rel_dir if rel_dir else self.root
+        try:
+            mtime_ns = os.stat(abs_dir).st_mtime_ns
+            entries = list(os.scandir(abs_dir))
+        except OSError:
+            self._drop_dir(rel_dir)
+            return
+
+        # Only doc or subdirectory changes are persisted; a bare mtime change
+        # is kept in memory (a later process re-lists the dir, cheaply)
+        if rel_dir not in self.dirs:
+            self._dirty = True
+        self.dirs[rel_dir] = mtime_ns
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        found: Set[str] = set()
+
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if not rel_dir and entry.name in STATE_DIRNAMES:
+                        continue
+                    if entry.is_symlink() and not self._follow_link(entry.path, rel_dir):
+                        continue
+                    child = prefix + entry.name
+                    if child not in self.dirs:
+                        self._scan_dir(child)
+                elif entry.name.endswith(".md"):
+                    st = entry.stat()
+                    if stat.S_ISREG(st.st_mode):
+                        doc = prefix + entry.name
+                        signature = [st.st_mtime_ns, st.st_size]
+                        if doc not in self.docs:
+                            self.docs_stamp = time.time_ns()
+                        if self.docs.get(doc) != signature:
+                            self.docs[doc] = signature
+                            self._dirty = True
+                        found.add(doc)
+            except OSError:
+                continue
+
+        removed = self._by_dir.get(rel_dir, set()) - found
+        for doc in removed:
+            self.docs.pop(doc, None)
+            self.headers.pop(doc, None)
+            self.tokens.pop(doc, None)
+        if removed:
+            self.docs_stamp = time.time_ns()
+            self._dirty = True
+        self._by_dir[rel_dir] = found
+
+    def _follow_link(self, link_path: str, rel_dir: str) -> bool:
+        """Follow directory symlinks that lead outside the root, within a depth bound."""
+        if rel_dir.count("/") >= MAX_LINK_DEPTH:
+            return False
+        target = os.path.realpath(link_path)
+        root = os.path.realpath(self.root)
+        return not (target == root or target.startswith(root + os.sep) or root.startswith(target + os.sep))
+
+    def _drop_dir(self, rel_dir: str) -> None:
+        if self.dirs.pop(rel_dir, None) is not None:
+            self._dirty = True
+        docs = self._by_dir.pop(rel_dir, set())
+        for doc in docs:
+            self.docs.pop(doc, None)
+            self.headers.pop(doc, None)
+            self.tokens.pop(doc, None)
+        if docs:
+            self.docs_stamp = time.time_ns()
+
+    # ------------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------------
+
+    def __contains__(self, rel_path: str) -> bool:
+        return rel_path in self.docs
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def get_header(self, rel_path: str, signature: Tuple[int, int], lines: int) -> Optional[str]:
+        """Precomputed warm header, if recorded for this exact doc version and line count."""
+        cached = self.headers.get(rel_path)
+        if cached and (cached[0], cached[1]) == signature and cached[2] == lines:
+            return cached[3]
+        return None
+
+    def put_header(self, rel_path: str, signature: Tuple[int, int], lines: int, header: str) -> None:
+        """Record a doc's warm header (persisted on the next save)."""
+        self.headers[rel_path] = [signature[0], signature[1], lines, header]
+        self._dirty = True
+
+    def get_tokens(self, rel_path: str, signature: Tuple[int, int]) -> Optional[int]:
+        """Estimated tokens of a doc's full text, if recorded for this exact doc version."""
+        cached = self.tokens.get(rel_path)
+        if cached and (cached[0], cached[1]) == signature:
+            return cached[2]
+        return None
+
+    def put_tokens(self, rel_path: str, signature: Tuple[int, int], tokens: int) -> None:
+        """Record a doc's full-text token estimate (persisted on the next save)."""
+        self.tokens[rel_path] = [signature[0], signature[1], tokens]
+        self._dirty = True
+
+    def missing(self, rel_paths) -> List[str]:
+        """Subset of rel_paths with no doc under the root."""
+        return [p for p in rel_paths if p not in self.docs]
+
+
+# Manifests by root (persist across turns under the router daemon)
+_MANIFESTS: Dict[Path, DocsManifest] = {}
+
+
+def get_docs_manifest(root: Path, refresh: bool = True) -> DocsManifest:
+    """Load (once per process) and optionally refresh the manifest for a docs root."""
+    manifest = _MANIFESTS.get(root)
+    if manifest is None:
+        manifest = _MANIFESTS[root] = DocsManifest.load(root)
+        refresh = True
+    if refresh:
+        manifest.refresh()
+        manifest.save()
+    return manifest
@@ -7,7 +7,8 @@ Usage:
   python3 history.py --file ppe         # Filter by file pattern
   python3 history.py --instance A       # Filter by instance
   python3 history.py --transitions      # Show only turns with tier changes
-  python3 history.py --stats            # Show summary statistics
+  python3 history.py --stats            # Show summary statistics (incl. per-phase latency)
+  python3 history.py --current          # Current attention, merged across instances
   python3 history.py --format json      # Output raw JSON
 """
 
@@ -18,7 +19,14 @@ from datetime import datetime, timedelta
 from collections import Counter
 import re
 
-HISTORY_FILE = Path.home() / ".claude" / "attention_history.jsonl"
+from history_store import HISTORY_DIR, LEGACY_HISTORY_FILE, iter_entries
+from phase_timer import percentile
+from phase_timer import PHASES
+from state_store import get_shard_path, read_merged_state, read_state
+
+STATE_DIRS = [Path(".claude"), Path.home() / ".claude"]
+HOT_THRESHOLD = 0.8
+WARM_THRESHOLD = 0.25
 
 
 def parse_duration(s: str) -> timedelta:
@@ -42,43 +50,37 @@ def load_history(
     file_pattern: str = None,
     transitions_only: bool = False
 ) -> list:
-    """Load and filter history entries."""
-    if not HISTORY_FILE.exists():
-        return []
-
+    """Load and filter history entries (segments outside `since` are skipped unread)."""
     cutoff = datetime.now() - since if since else None
     entries = []
 
-    with open(HISTORY_FILE) as f:
-        for line in f:
-            try:
-                entry = json.loads(line.strip())
+    for entry in iter_entries(since=cutoff):
+        try:
+            # Time filter
+            if cutoff:
+                entry_time = datetime.fromisoformat(entry["timestamp"])
+                if entry_time < cutoff:
+                    continue
 
-                # Time filter
-                if cutoff:
-                    entry_time = datetime.fromisoformat(entry["timestamp"])
-                    if entry_time < cutoff:
-                        continue
+            # Instance filter
+            if instance and entry.get("instance_id") != instance:
+                continue
 
-                # Instance filter
-                if instance and entry.get("instance_id") != instance:
+            # File pattern filter
+            if file_pattern:
+                all_files = entry.get("hot", []) + entry.get("warm", []) + entry.get("activated", [])
+                if not any(file_pattern.lower() in f.lower() for f in all_files):
                     continue
 
-                # File pattern filter
-                if file_pattern:
-                    all_files = entry.get("hot", []) + entry.get("warm", []) + entry.get("activated", [])
-                    if not any(file_pattern.lower() in f.lower() for f in all_files):
-                        continue
-
-                # Transitions filter
-                if transitions_only:
-                    trans = entry.get("transitions", {})
-                    if not any(trans.get(k) for k in ["to_hot", "to_warm", "to_cold"]):
-                        continue
+            # Transitions filter
+            if transitions_only:
+                trans = entry.get("transitions", {})
+                if not any(trans.get(k) for k in ["to_hot", "to_warm", "to_cold"]):
+                    continue
 
-                entries.append(entry)
-            except json.JSONDecodeError:
-                continue
+            entries.append(entry)
+        except (KeyError, TypeError, ValueError):
+            continue
 
     return entries
 
@@ -136,6 +138,61 @@ def format_stats(entries: list) -> str:
     avg_chars = sum(e.get("total_chars", 0) for e in entries) / len(entries)
     lines.append(f"\nAverage context size: {avg_chars:,.0f} chars")
 
+    lines.extend(format_phase_latency(entries))
+
+    return "\n".join(lines)
+
+
+def format_phase_latency(entries: list) -> list:
+    """Per-phase latency percentiles (ms) from the entries' timings_ns."""
+    samples = {}
+    for entry in entries:
+        for phase, ns in (entry.get("timings_ns") or {}).items():
+            samples.setdefault(phase, []).append(ns / 1e6)
+    if not samples:
+        return []
+
+    order = [p for p in PHASES if p in samples]
+    order += sorted(p for p in samples if p not in PHASES and p != "total")
+    if "total" in samples:
+        order.append("total")
+
+    lines = [f"\nRouter latency (ms, {len(samples.get('total', []))} timed turns):"]
+    lines.append(f"  {'phase':<12} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for phase in order:
+        values = sorted(samples[phase])
+        lines.append(
+            f"  {phase:<12} {percentile(values, 50):>8.2f} {percentile(values, 95):>8.2f} "
+            f"{percentile(values, 99):>8.2f} {values[-1]:>8.2f}"
+        )
+    return lines
+
+
+def load_current_state(instance: str = None) -> dict:
+    """Current attention state: one instance's shard, or all shards merged."""
+    for state_dir in STATE_DIRS:
+        if not state_dir.is_dir():
+            continue
+        state = read_state(get_shard_path(state_dir, instance)) if instance else read_merged_state(state_dir)
+        if state is not None:
+            return state
+    return None
+
+
+def format_current(state: dict) -> str:
+    """Format current HOT/WARM files."""
+    scores = state.get("scores", {})
+    ranked = sorted(((f, s) for f, s in scores.items() if s >= WARM_THRESHOLD), key=lambda x: x[1], reverse=True)
+
+    lines = []
+    instances = state.get("instances")
+    scope = f"merged across {instances} instance(s)" if instances else f"turn {state.get('turn_count', 0)}"
+    lines.append(f"\nCurrent attention ({scope}, updated {(state.get('last_update') or '?')[:19]})")
+    for file, score in ranked:
+        tier = "🔥 HOT " if score >= HOT_THRESHOLD else "🌡️  WARM"
+        lines.append(f"  {tier} {score:.2f}  {file}")
+    if not ranked:
+        lines.append("  (no HOT or WARM files)")
     return "\n".join(lines)
 
 
@@ -198,6 +255,7 @@ Examples:
   history.py --transitions        # Only tier changes
   history.py --stats              # Summary statistics
   history.py --instance A         # Filter by instance
+  history.py --current            # Current attention (all instances)
         """
     )
     parser.add_argument("--since", type=str, help="Time window (e.g., 2h, 30m, 1d)")
@@ -206,10 +264,21 @@ Examples:
     parser.add_argument("--file", type=str, help="Filter by file pattern")
     parser.add_argument("--transitions", action="store_true", help="Show only turns with tier changes")
     parser.add_argument("--stats", action="store_true", help="Show summary statistics")
+    parser.add_argument("--current", action="store_true", help="Show current attention state (merged across instances unless --instance)")
     parser.add_argument("--format", choices=["text", "json"], default="text", help="Output format")
 
     args = parser.parse_args()
 
+    if args.current:
+        state = load_current_state(args.instance)
+        if state is None:
+            print("No attention state found.")
+        elif args.format == "json":
+            print(json.dumps(state, indent=2))
+        else:
+            print(format_current(state))
+        return
+
     since = parse_duration(args.since) if args.since else None
     entries = load_history(
         since=since,
@@ -224,8 +293,8 @@ Examples:
 
     if not entries:
         print("No history entries found.")
-        if not HISTORY_FILE.exists():
-            print(f"\nHistory file not found: {HISTORY_FILE}")
+        if not HISTORY_DIR.exists() and not LEGACY_HISTORY_FILE.exists():
+            print(f"\nHistory directory not found: {HISTORY_DIR}")
             print("History tracking starts after first turn with updated router.")
         return
 
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+History Store - segmented, retention-managed attention history
+
+Entries go to daily segments, ~/.claude/attention_history/YYYY-MM-DD.jsonl.
+Once a day, off the prompt path (router daemon upkeep, or the usage Stop
+hook via compact_if_due()), closed segments are compacted:
+
+- each gets a manifest record (time range, turn range, entry count)
+- segments older than COMPRESS_AFTER_DAYS are gzipped
+- segments older than MAX_HISTORY_DAYS are deleted
+
+Readers use the manifest (or the segment's date) to skip whole segments
+outside a --since window. A pre-segment attention_history.jsonl is split
+into daily segments on the first compaction.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+HISTORY_DIR = Path.home() / ".claude" / "attention_history"
+LEGACY_HISTORY_FILE = Path.home() / ".claude" / "attention_history.jsonl"
+MAX_HISTORY_DAYS = 30       # Delete segments older than this
+COMPRESS_AFTER_DAYS = 2     # Gzip closed segments older than this
+
+MANIFEST_FILENAME = "manifest.json"
+COMPACTED_FILENAME = ".compacted"  # Day of the last completed compaction
+LOCK_FILENAME = ".compact.lock"
+LOCK_STALE_SECONDS = 600    # A compaction lock older than this is abandoned
+
+
+def segment_day(path: Path) -> Optional[date]:
+    """Day a segment covers, from its name (YYYY-MM-DD.jsonl[.gz])."""
+    try:
+        return date.fromisoformat(path.name.split(".", 1)[0])
+    except ValueError:
+        return None
+
+
+def list_segments(history_dir: Path = HISTORY_DIR) -> List[Path]:
+    """Segments oldest day first."""
+    segments = [
+        p for p in history_dir.glob("*.jsonl*")
+        if p.suffix in (".jsonl", ".gz") and segment_day(p) is not None
+    ]
+    return sorted(segments, key=lambda p: (segment_day(p), p.suffix != ".gz"))
+
+
+def _open_segment(path: Path):
+    return gzip.open(path, "rt") if path.suffix == ".gz" else open(path)
+
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+def load_manifest(history_dir: Path = HISTORY_DIR) -> Dict[str, dict]:
+    """Day (YYYY-MM-DD) -> {file, size, start, end, first_turn, last_turn, entries}."""
+    try:
+        manifest = json.loads((history_dir / MANIFEST_FILENAME).read_text())
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(history_dir: Path, manifest: Dict[str, dict]) -> None:
+    path = history_dir / MANIFEST_FILENAME
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _scan_segment(path: Path) -> dict:
+    """Time range, turn range and entry count of a segment."""
+    info = {"file": path.name, "size": path.stat().st_size, "start": None, "end": None,
+            "first_turn": None, "last_turn": None, "entries": 0}
+    with _open_segment(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                ts, turn = entry["timestamp"], entry.get("turn")
+            except (ValueError, KeyError, TypeError):
+                continue
+            info["entries"] += 1
+            info["start"] = ts if info["start"] is None else min(info["start"], ts)
+            info["end"] = ts if info["end"] is None else max(info["end"], ts)
+            if isinstance(turn, int):
+                info["first_turn"] = turn if info["first_turn"] is None else min(info["first_turn"], turn)
+                info["last_turn"] = turn if info["last_turn"] is None else max(info["last_turn"], turn)
+    return info
+
+
+# ============================================================================
+# WRITING
+# ============================================================================
+
+def _append_lines(path: Path, data: bytes) -> None:
+    """One O_APPEND write, so concurrent instances don't interleave lines."""
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def append_entry(entry: dict, history_dir: Path = HISTORY_DIR) -> None:
+    """Append an entry to its day's segment (compaction runs elsewhere, see compact_if_due())."""
+    history_dir.mkdir(parents=True, exist_ok=True)
+    segment = history_dir / f"{entry['timestamp'][:10]}.jsonl"
+    _append_lines(segment, (json.dumps(entry) + "\n").encode("utf-8"))
+
+
+def _acquire_lock(history_dir: Path) -> bool:
+    lock = history_dir / LOCK_FILENAME
+    try:
+        if time.time() - lock.stat().st_mtime > LOCK_STALE_SECONDS:
+            lock.unlink()
+    except OSError:
+        pass
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except OSError:
+        return False  # Another process is compacting
+
+
+def _migrate_legacy(history_dir: Path, legacy_file: Path) -> None:
+    """Split a pre-segment history file into daily segments, then remove it."""
+    by_day: Dict[str, List[str]] = {}
+    with open(legacy_file) as f:
+        for line in f:
+            try:
+                day = json.loads(line)["timestamp"][:10]
+                date.fromisoformat(day)
+            except (ValueError, KeyError, TypeError):
+                continue
+            by_day.setdefault(day, []).append(line if line.endswith("\n") else line + "\n")
+    for day, lines in by_day.items():
+        _append_lines(history_dir / f"{day}.jsonl", "".join(lines).encode("utf-8"))
+    legacy_file.unlink()
+
+
+def compact_history(history_dir: Path = HISTORY_DIR, today: Optional[date] = None,
+                    legacy_file: Path = LEGACY_HISTORY_FILE) -> None:
+    """Migrate legacy history, then index, gzip and expire closed segments."""
+    today = today or date.today()
+    history_dir.mkdir(parents=True, exist_ok=True)
+    if not _acquire_lock(history_dir):
+        return
+    try:
+        if legacy_file.exists():
+            _migrate_legacy(history_dir, legacy_file)
+
+        manifest = load_manifest(history_dir)
+        for segment in list_segments(history_dir):
+            day = segment_day(segment)
+            key = day.isoformat()
+            if day >= today:
+                continue  # Still being written
+            if (today - day).days > MAX_HISTORY_DAYS:
+                segment.unlink()
+                manifest.pop(key, None)
+                continue
+
+            info = manifest.get(key)
+            if info is None or info.get("file") != segment.name or info.get("size") != segment.stat().st_size:
+                info = manifest[key] = _scan_segment(segment)
+
+            if segment.suffix != ".gz" and (today - day).days > COMPRESS_AFTER_DAYS:
+                gz_path = segment.with_name(segment.name + ".gz")
+                tmp_path = gz_path.with_name(f"{gz_path.name}.{os.getpid()}.tmp")
+                with open(segment, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.replace(tmp_path, gz_path)
+                segment.unlink()
+                info.update(file=gz_path.name, size=gz_path.stat().st_size)
+
+        for key in [k for k in manifest if not (history_dir / manifest[k].get("file", "")).exists()]:
+            del manifest[key]
+        _save_manifest(history_dir, manifest)
+        (history_dir / COMPACTED_FILENAME).write_text(today.isoformat())
+    except OSError:
+        pass  # Retention is best-effort; never fail the hook over it
+    finally:
+        try:
+            (history_dir / LOCK_FILENAME).unlink()
+        except OSError:
+            pass
+
+
+def compact_if_due(history_dir: Path = HISTORY_DIR, today: Optional[date] = None,
+                   legacy_file: Path = LEGACY_HISTORY_FILE) -> None:
+    """compact_history() unless it already ran today (one small read when not due)."""
+    today = today or date.today()
+    try:
+        done = (history_dir / COMPACTED_FILENAME).read_text().strip() == today.isoformat()
+    except OSError:
+        done = False
+    if legacy_file.exists() or (not done and history_dir.is_dir()):
+        compact_history(history_dir, today, legacy_file)
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+def iter_entries(since: Optional[datetime] = None, history_dir: Path = HISTORY_DIR,
+                 legacy_file: Path = LEGACY_HISTORY_FILE) -> Iterator[dict]:
+    """
+    History entries oldest first. Segments that end before `since` are
+    skipped without being opened; entries inside a read segment are not
+    filtered (callers apply exact filters).
+    """
+    sources: List[Path] = []
+    if legacy_file.exists():
+        sources.append(legacy_file)  # Not yet migrated
+
+    manifest = load_manifest(history_dir)
+    for segment in list_segments(history_dir):
+        if since is not None:
+            day = segment_day(segment)
+            info = manifest.get(day.isoformat())
+            try:
+                end = datetime.fromisoformat(info["end"]) if info and info.get("end") else None
+            except (TypeError, ValueError):
+                end = None
+            if end is None:
+                end = datetime.combine(day + timedelta(days=1), datetime.min.time())
+            if end < since:
+                continue
+        sources.append(segment)
+
+    for source in sources:
+        try:
+            with _open_segment(source) as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except (OSError, EOFError):
+            continue
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Injection Ledger - per-session record of context blocks already injected
+
+Backs the router's delta mode: a block's full body is only re-emitted when
+the file newly enters HOT/WARM, changes tier, or its content hash changes.
+Otherwise a one-line "still active" marker stands in for it, since the
+earlier copy is still in the conversation.
+
+Stored per session at <state dir>/.cache/delta/<session>.json.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DELTA_REFRESH_TURNS = 20   # Re-emit full bodies at least this often (survives compaction)
+
+
+def block_hash(tier: str, body: str) -> str:
+    """Content hash of an injected block."""
+    return hashlib.sha1(f"{tier}\n{body}".encode("utf-8", "replace")).hexdigest()
+
+
+def get_ledger_path(state_dir: Path, session_id: str) -> Path:
+    """Ledger file for a session (session ID sanitized for use as a filename)."""
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)[:64] or "default"
+    return state_dir / ".cache" / "delta" / f"{safe}.json"
+
+
+class InjectionLedger:
+    """
+    file -> {tier, hash, first_turn, last_turn} for one session.
+
+    Turns are counted per session (not the shared attention turn_count), so
+    other sessions routing in between don't break continuity.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.turn = 0
+        self.blocks: Dict[str, dict] = {}
+        try:
+            data = json.loads(path.read_text())
+            self.turn = data.get("turn", 0)
+            self.blocks = data.get("blocks", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def begin_turn(self) -> None:
+        """Advance the session turn; call once before check()ing this turn's blocks."""
+        self.turn += 1
+
+    def check(self, file_path: str, tier: str, body: str) -> Optional[int]:
+        """
+        Record that a block is being injected this turn.
+
+        Returns how many turns ago the identical body was emitted if it is
+        still in the conversation (injected last turn, same tier and hash,
+        within the refresh window), else None: the full body must be emitted.
+        """
+        digest = block_hash(tier, body)
+        prev = self.blocks.get(file_path)
+        unchanged = (
+            prev is not None
+            and prev["hash"] == digest
+            and prev["last_turn"] == self.turn - 1
+            and self.turn - prev["first_turn"] < DELTA_REFRESH_TURNS
+        )
+        if unchanged:
+            prev["last_turn"] = self.turn
+            return self.turn - prev["first_turn"]
+
+        self.blocks[file_path] = {"tier": tier, "hash": digest, "first_turn": self.turn, "last_turn": self.turn}
+        return None
+
+    def prune(self) -> None:
+        """Forget blocks not injected this turn (they left the active set)."""
+        self.blocks = {f: b for f, b in self.blocks.items() if b["last_turn"] == self.turn}
+
+    def save(self) -> None:
+        """Atomically write the ledger."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({"turn": self.turn, "blocks": self.blocks}))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # Worst case the next turn re-emits full bodies
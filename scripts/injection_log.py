@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Injection Log - structured, rotating log of injected context
+
+One JSON line per routing turn: turn, instance, stats, activated files and
+one {file, tier, score, hash, chars} record per injected block. Full
+injected text is only stored for sampled turns (CONTEXT_LOG_SAMPLE, a
+0..1 rate) or every turn with CONTEXT_LOG_DEBUG=1.
+
+The active segment (~/.claude/injection_log/current.jsonl) is closed once it
+exceeds INJECTION_LOG_MAX_BYTES or INJECTION_LOG_MAX_AGE_HOURS, gzipped to
+injection-<timestamp>.jsonl.gz, and only the newest INJECTION_LOG_KEEP
+closed segments are kept.
+
+Usage: python3 injection_log.py [--last N] [--bodies]   (print recent turns)
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+INJECTION_LOG_DIR = Path.home() / ".claude" / "injection_log"
+INJECTION_LOG_MAX_BYTES = 5 * 1024 * 1024   # Rotate the active segment past 5 MB
+INJECTION_LOG_MAX_AGE_HOURS = 24            # ... or once it is a day old
+INJECTION_LOG_KEEP = 20                     # Closed segments to keep
+
+CURRENT_SEGMENT = "current.jsonl"
+
+
+def sample_bodies() -> bool:
+    """Whether this turn's record should carry the full injected text."""
+    if os.getenv("CONTEXT_LOG_DEBUG", "0") == "1":
+        return True
+    try:
+        rate = float(os.getenv("CONTEXT_LOG_SAMPLE", "0"))
+    except ValueError:
+        return False
+    return rate > 0 and random.random() < rate
+
+
+# ============================================================================
+# WRITING
+# ============================================================================
+
+def _segment_started(path: Path) -> Optional[float]:
+    """Epoch time of a segment's first record (None if empty or unreadable)."""
+    try:
+        with open(path) as f:
+            return json.loads(f.readline())["ts_epoch"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _needs_rotation(path: Path) -> bool:
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return False
+    if size >= INJECTION_LOG_MAX_BYTES:
+        return True
+    started = _segment_started(path)
+    return started is not None and time.time() - started >= INJECTION_LOG_MAX_AGE_HOURS * 3600
+
+
+def rotate(log_dir: Path = INJECTION_LOG_DIR) -> None:
+    """Close the active segment: rename, gzip, and drop the oldest closed segments."""
+    current = log_dir / CURRENT_SEGMENT
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    closing = log_dir / f"injection-{stamp}-{os.getpid()}.jsonl"
+    try:
+        os.rename(current, closing)   # Atomic: concurrent appenders start a new segment
+    except OSError:
+        return  # Another process rotated first
+
+    try:
+        with open(closing, "rb") as src, gzip.open(f"{closing}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        closing.unlink()
+    except OSError:
+        pass  # Left uncompressed; still listed and read as a segment
+
+    closed = sorted(p for p in log_dir.glob("injection-*.jsonl*"))
+    for old in closed[:-INJECTION_LOG_KEEP]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+def append_record(record: dict, log_dir: Path = INJECTION_LOG_DIR) -> None:
+    """Append one record to the active segment, rotating it first if due."""
+    try:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        current = log_dir / CURRENT_SEGMENT
+        if _needs_rotation(current):
+            rotate(log_dir)
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        # One O_APPEND write per record, so concurrent instances don't interleave lines
+        fd = os.open(current, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # Never fail the hook over logging
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+def list_segments(log_dir: Path = INJECTION_LOG_DIR) -> List[Path]:
+    """Closed segments oldest first, then the active one."""
+    segments = sorted(log_dir.glob("injection-*.jsonl*"))
+    current = log_dir / CURRENT_SEGMENT
+    if current.exists():
+        segments.append(current)
+    return segments
+
+
+def iter_records(log_dir: Path = INJECTION_LOG_DIR) -> Iterator[dict]:
+    """All records, oldest first, across closed (gzipped) and active segments."""
+    for segment in list_segments(log_dir):
+        opener = gzip.open if segment.suffix == ".gz" else open
+        try:
+            with opener(segment, "rt") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except (OSError, EOFError):
+            continue
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def format_record(record: dict, bodies: bool) -> str:
+    stats = record.get("stats", {})
+    lines = [
+        f"[{record.get('ts', '?')}] Instance {record.get('instance', '?')} | Turn {record.get('turn', '?')}",
+        f"  Hot={stats.get('hot', 0)} Warm={stats.get('warm', 0)} Cold={stats.get('cold', 0)} "
+        f"| {stats.get('total_chars', 0):,} chars",
+        f"  Activated: {', '.join(record.get('activated', [])) or 'none'}",
+    ]
+    for block in record.get("blocks", []):
+        lines.append(f"  [{block['tier']}] {block['file']} (score: {block['score']:.2f}, {block['chars']:,} chars, {block['hash'][:10]})")
+    if bodies and record.get("output"):
+        lines.append(record["output"])
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show recent context injections")
+    parser.add_argument("--last", type=int, default=10, help="Last N turns (default: 10)")
+    parser.add_argument("--bodies", action="store_true", help="Include full injected text where sampled")
+    args = parser.parse_args()
+
+    records = list(deque(iter_records(), maxlen=args.last))
+    if not records:
+        print(f"No injection records in {INJECTION_LOG_DIR}", file=sys.stderr)
+        return
+    print("\n\n".join(format_record(r, args.bodies) for r in records))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Keyword Index - Compiled, cached form of keywords.json
+
+Holds everything the router derives from keywords.json: the keyword table,
+the keyword matcher (word-boundary tokens by default, Aho-Corasick substrings
+with "matching": "substring"), interned file IDs and the co-activation graph in
+CSR form (indptr / indices / per-edge weights) for spreading activation.
+Learned keyword weights (keyword_weights.json next to the config, written by
+usage_tracker.py) are merged into the index, so scoring needs no extra read.
+
+The compiled index is cached next to the config (.claude/.cache/keywords.idx)
+and loaded with a single read; it is rebuilt automatically when the source
+config's mtime, size or content hash changes, and re-weighted when the
+weights file changes. The file is a JSON header line (checked first) followed
+by the pickled index, which is unpickled with only the index's own classes
+allowed, so a planted cache file cannot run code.
+"""
+
+import hashlib
+import io
+import json
+import os
+import pickle
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from keyword_matcher import KeywordMatcher
+from token_matcher import TokenMatcher
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+INDEX_VERSION = 5             # Bump whenever the cache file layout changes
+CACHE_DIRNAME = ".cache"      # Sidecar cache directory inside .claude/
+INDEX_FILENAME = "keywords.idx"
+WEIGHTS_FILENAME = "keyword_weights.json"
+
+
+# ============================================================================
+# COMPILED INDEX
+# ============================================================================
+
+# co_activation targets: a list of paths (weight 1.0 each) or {path: weight}
+CoActivationTargets = Union[List[str], Dict[str, float]]
+
+# "matching" modes of keywords.json
+MATCHERS = {"tokens": TokenMatcher, "substring": KeywordMatcher}
+
+
+def _weighted_targets(targets: CoActivationTargets) -> List[Tuple[str, float]]:
+    if isinstance(targets, dict):
+        return [(target, float(weight)) for target, weight in targets.items()]
+    return [(target, 1.0) for target in targets]
+
+
+class KeywordIndex:
+    """Keyword table, matcher and co-activation graph over interned file IDs."""
+
+    def __init__(self, keywords: Dict[str, List[str]], co_activation: Dict[str, CoActivationTargets],
+                 matching: str = "tokens"):
+        self.keywords = keywords
+        self.co_activation = co_activation
+        self.matching = matching
+
+        # Intern every file that appears anywhere in the config
+        self.files: List[str] = []
+        self.file_ids: Dict[str, int] = {}
+        for path in keywords:
+            self.intern(path)
+        for source, targets in co_activation.items():
+            self.intern(source)
+            for target in targets:
+                self.intern(target)
+
+        # CSR adjacency: edges of file i are indices/weights[indptr[i]:indptr[i + 1]]
+        # (target order of the config is preserved)
+        edges: Dict[int, List[Tuple[str, float]]] = {
+            self.file_ids[source]: _weighted_targets(targets)
+            for source, targets in co_activation.items()
+        }
+        self.indptr = array("l", [0])
+        self.indices = array("l")
+        self.weights = array("d")
+        for file_id in range(len(self.files)):
+            for target, weight in edges.get(file_id, ()):
+                self.indices.append(self.file_ids[target])
+                self.weights.append(weight)
+            self.indptr.append(len(self.indices))
+
+        self.matcher = MATCHERS[matching](keywords)
+        self.keyword_weights: Dict[str, float] = {}   # keyword -> activation weight, only where != 1.0
+
+    def set_weights(self, learned: Dict[str, float]) -> None:
+        """Merge learned weights, clipped to [0, 1], for this config's keywords."""
+        known = {kw for keyword_list in self.keywords.values() for kw in keyword_list}
+        self.keyword_weights = {}
+        for kw, weight in learned.items():
+            if kw in known and isinstance(weight, (int, float)):
+                clipped = max(0.0, min(1.0, float(weight)))
+                if clipped != 1.0:
+                    self.keyword_weights[kw] = clipped
+
+    def activation(self, matched: Iterable[str]) -> float:
+        """
+        Activation strength of a file from its matched keywords: noisy-or of
+        their weights, so one full-weight keyword gives 1.0 and several weak
+        ones add up (two at 0.5 give 0.75).
+        """
+        miss = 1.0
+        for kw in matched:
+            miss *= 1.0 - self.keyword_weights.get(kw, 1.0)
+        return 1.0 - miss
+
+    def intern(self, path: str) -> int:
+        """Return the ID for a file path, assigning one if new."""
+        file_id = self.file_ids.get(path)
+        if file_id is None:
+            file_id = len(self.files)
+            self.file_ids[path] = file_id
+            self.files.append(path)
+        return file_id
+
+    def neighbours(self, path: str) -> List[str]:
+        """Co-activation targets of a file."""
+        file_id = self.file_ids.get(path)
+        if file_id is None:
+            return []
+        return [self.files[i] for i in self.indices[self.indptr[file_id]:self.indptr[file_id + 1]]]
+
+    def spread(self, sources: Union[Iterable[str], Dict[str, float]], hops: int, attenuation: float,
+               min_energy: float) -> Dict[str, float]:
+        """
+        Spreading activation from sources (energy 1.0 each, or {path: energy})
+        over the graph.
+
+        Hop 1 gives each target the sum of its incoming edge weights; every
+        further hop passes on attenuation x weight x the sender's energy
+        (capped at 1.0). A file is reached once, on its shortest hop, and
+        files below min_energy neither count nor spread further, so each
+        edge is scanned at most once per call.
+
+        Returns: {path: energy} for reached files other than the sources
+        """
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        energies = sources if isinstance(sources, dict) else dict.fromkeys(sources, 1.0)
+        frontier = {self.file_ids[s]: e for s, e in energies.items() if s in self.file_ids}
+        visited = set(frontier)
+        reached: Dict[str, float] = {}
+        scale = 1.0
+
+        for _ in range(hops):
+            incoming: Dict[int, float] = {}
+            for source_id, energy in frontier.items():
+                for edge in range(indptr[source_id], indptr[source_id + 1]):
+                    target_id = indices[edge]
+                    if target_id not in visited:
+                        incoming[target_id] = incoming.get(target_id, 0.0) + energy * weights[edge]
+
+            frontier = {}
+            for target_id, energy in incoming.items():
+                energy *= scale
+                if energy >= min_energy:
+                    visited.add(target_id)
+                    reached[self.files[target_id]] = energy
+                    frontier[target_id] = min(1.0, energy)
+            if not frontier:
+                break  # Converged: nothing left above the cutoff
+            scale = attenuation
+
+        return reached
+
+
+def parse_keyword_config(raw: bytes) -> Tuple[Dict[str, List[str]], Dict[str, List[str]], str]:
+    """
+    Parse keywords.json content into (keywords, co_activation, matching).
+
+    Raises ValueError if the config has no usable keyword table or an
+    unknown "matching" mode.
+    """
+    config = json.loads(raw)
+    keywords = config.get("keywords", {})
+    co_activation = config.get("co_activation", {})
+    matching = config.get("matching", "tokens")
+    if not keywords or not isinstance(keywords, dict):
+        raise ValueError("no 'keywords' table")
+    if matching not in MATCHERS:
+        raise ValueError(f"unknown matching mode {matching!r} (use {' or '.join(MATCHERS)})")
+    return keywords, co_activation, matching
+
+
+# ============================================================================
+# ON-DISK CACHE
+# ============================================================================
+
+def get_index_path(config_path: Path) -> Path:
+    """Compiled index location for a given keywords.json."""
+    return config_path.parent / CACHE_DIRNAME / INDEX_FILENAME
+
+
+def get_weights_path(config_path: Path) -> Path:
+    """Learned keyword weights for a given keywords.json."""
+    return config_path.parent / WEIGHTS_FILENAME
+
+
+def load_keyword_weights(weights_path: Path) -> Dict[str, float]:
+    """{keyword: weight} from keyword_weights.json ({} if missing or invalid)."""
+    try:
+        weights = json.loads(weights_path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return weights if isinstance(weights, dict) else {}
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_cached(index_path: Path, config_path: Path) -> Tuple[Optional[dict], Optional[io.BytesIO]]:
+    """
+    Read the cache file with one read. Returns (header, stream positioned at
+    the pickled index), or (None, None) if missing or built for another source.
+    """
+    try:
+        stream = io.BytesIO(index_path.read_bytes())
+        header = json.loads(stream.readline())
+    except (OSError, ValueError):
+        return None, None
+    if not isinstance(header, dict):
+        return None, None
+    if header.get("version") != INDEX_VERSION or header.get("source") != str(config_path.resolve()):
+        return None, None
+    return header, stream
+
+
+# The only globals a pickled KeywordIndex refers to
+_INDEX_GLOBALS = {
+    ("keyword_index", "KeywordIndex"),
+    ("keyword_matcher", "KeywordMatcher"),
+    ("token_matcher", "TokenMatcher"),
+    ("array", "array"),
+    ("array", "_array_reconstructor"),
+}
+
+
+class _IndexUnpickler(pickle.Unpickler):
+    """Unpickler that refuses any global outside _INDEX_GLOBALS."""
+
+    def find_class(self, module: str, name: str):
+        if (module, name) not in _INDEX_GLOBALS:
+            raise pickle.UnpicklingError(f"{module}.{name} not allowed in {INDEX_FILENAME}")
+        return super().find_class(module, name)
+
+
+def _unpickle_index(stream: io.BytesIO) -> Optional[KeywordIndex]:
+    try:
+        index = _IndexUnpickler(stream).load()
+    except Exception:
+        return None
+    return index if isinstance(index, KeywordIndex) else None
+
+
+def _write_cached(index_path: Path, header: dict, index: KeywordIndex) -> None:
+    """Atomically write header line + index (temp file, then os.replace)."""
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass  # Cache is an optimization; never fail the hook over it
+
+
+def load_keyword_index(config_path: Path) -> Tuple[KeywordIndex, bool]:
+    """
+    Load the compiled index for config_path, rebuilding the cache if stale.
+
+    Returns: (index, from_cache)
+    Raises: OSError / ValueError if the config is unreadable or invalid
+    """
+    st = config_path.stat()
+    index_path = get_index_path(config_path)
+    weights_path = get_weights_path(config_path)
+    weights_signature = list(_signature(weights_path) or ()) or None  # JSON form (header is JSON)
+    header, stream = _read_cached(index_path, config_path)
+
+    def reweighted(index: KeywordIndex, restamp: bool) -> KeywordIndex:
+        # Weights file changed since the cache was written: merge and re-save
+        if header.get("weights") != weights_signature:
+            index.set_weights(load_keyword_weights(weights_path))
+            header["weights"] = weights_signature
+            restamp = True
+        if restamp:
+            _write_cached(index_path, header, index)
+        return index
+
+    if header is not None and (header.get("mtime_ns"), header.get("size")) == (st.st_mtime_ns, st.st_size):
+        index = _unpickle_index(stream)
+        if index is not None:
+            return reweighted(index, restamp=False), True
+
+    raw = config_path.read_bytes()
+    digest = hashlib.sha1(raw).hexdigest()
+
+    if header is not None and header.get("sha1") == digest:
+        # Touched but unchanged: re-stamp the existing cache instead of rebuilding
+        index = _unpickle_index(stream)
+        if index is not None:
+            header.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+            return reweighted(index, restamp=True), True
+
+    keywords, co_activation, matching = parse_keyword_config(raw)
+    index = KeywordIndex(keywords, co_activation, matching)
+    index.set_weights(load_keyword_weights(weights_path))
+    header = {
+        "version": INDEX_VERSION,
+        "source": str(config_path.resolve()),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha1": digest,
+        "weights": weights_signature,
+    }
+    _write_cached(index_path, header, index)
+    return index, False
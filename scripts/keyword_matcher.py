@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher - Aho-Corasick multi-pattern search for keyword activation
+
+Compiles every keyword from keywords.json into one automaton keyed back to the
+files that own it, so a single pass over the prompt finds all activated files.
+Cost grows with prompt length (plus matches), not with the number of keywords.
+
+Matching is plain substring semantics, identical to `kw in prompt_lower`.
+"""
+
+from collections import deque
+from typing import Dict, List, Set
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over all keywords of all files."""
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: {file_path: [keyword, ...]} as loaded from keywords.json
+        """
+        self.patterns: List[str] = []         # pattern id -> keyword
+        self.owners: List[List[str]] = []     # pattern id -> files owning it
+        self._always: List[int] = []          # empty keywords match every prompt
+
+        # Trie: goto transitions, failure links, own outputs, dictionary links
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._dict_link: List[int] = [0]
+
+        pattern_ids: Dict[str, int] = {}
+        for path, keyword_list in keywords.items():
+            for kw in keyword_list:
+                if kw not in pattern_ids:
+                    pattern_ids[kw] = len(self.patterns)
+                    self.patterns.append(kw)
+                    self.owners.append([])
+                    self._insert(kw, pattern_ids[kw])
+                owners = self.owners[pattern_ids[kw]]
+                if path not in owners:
+                    owners.append(path)
+
+        self._build_links()
+
+    def _insert(self, keyword: str, pattern_id: int) -> None:
+        if not keyword:
+            self._always.append(pattern_id)
+            return
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._dict_link.append(0)
+            node = nxt
+        self._out[node].append(pattern_id)
+
+    def _build_links(self) -> None:
+        """BFS over the trie to set failure and dictionary-suffix links."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Nearest proper suffix state that ends a keyword
+                suffix = self._fail[child]
+                self._dict_link[child] = suffix if self._out[suffix] else self._dict_link[suffix]
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """
+        Single pass over text.
+
+        Returns:
+            {file_path: {keywords that fired}} for every activated file
+        """
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        dict_link = self._dict_link
+
+        # Collect terminal states first; expand to patterns once per state
+        hit_states: Set[int] = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node] or dict_link[node]:
+                hit_states.add(node)
+
+        fired: Set[int] = set(self._always)
+        expanded: Set[int] = set()
+        for state in hit_states:
+            while state and state not in expanded:
+                expanded.add(state)
+                fired.update(out[state])
+                state = dict_link[state]
+
+        matches: Dict[str, Set[str]] = {}
+        for pattern_id in fired:
+            keyword = self.patterns[pattern_id]
+            for path in self.owners[pattern_id]:
+                matches.setdefault(path, set()).add(keyword)
+        return matches
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Phase Timer - per-phase latency of a routing turn
+
+A lap timer over time.perf_counter_ns(): each lap(phase) charges the time
+since the previous mark to that phase, so consecutive laps cover the whole
+turn with one clock read per phase (well under 1% of a turn).
+
+Phases (in turn order):
+    config      keyword index load (one-shot: at import; daemon: refresh)
+    docs_root   docs root resolution, docs manifest and keyword validation
+    state_load  state shard (and delta ledger) load
+    content     content index refresh and BM25 query
+    match       keyword activation
+    spread      co-activation spreading and pinned floors
+    decay       lazy decay / materializing live scores
+    sections    section activation of HOT docs (CONTEXT_CHUNKS=1 only)
+    rank        HOT/WARM candidate ranking
+    read        doc prefetch, reads and packing
+    format      block rendering and output assembly
+    save        state shard (and ledger) write
+    log         injection log append
+    history     history append (recorded in the metrics log only)
+
+Timings are written to each history entry as "timings_ns"; with
+CONTEXT_METRICS_LOG=<path>, every turn's timings are also appended there
+as one JSON line. percentile() summarizes them (history.py --stats,
+bench-router.py).
+"""
+
+import json
+import math
+import os
+import time
+from typing import Dict, Optional
+
+PHASES = [
+    "config", "docs_root", "state_load", "content", "match", "spread", "decay", "sections",
+    "rank", "read", "format", "save", "log", "history",
+]
+METRICS_LOG = os.getenv("CONTEXT_METRICS_LOG")
+
+
+class PhaseTimer:
+    """Nanosecond lap timer accumulating per-phase durations."""
+
+    __slots__ = ("timings", "_last")
+
+    def __init__(self):
+        self.timings: Dict[str, int] = {}
+        self._last = time.perf_counter_ns()
+
+    def reset(self) -> None:
+        """Start timing from now without charging the elapsed time to a phase."""
+        self._last = time.perf_counter_ns()
+
+    def lap(self, phase: str) -> None:
+        """Charge the time since the previous mark to phase."""
+        now = time.perf_counter_ns()
+        self.timings[phase] = self.timings.get(phase, 0) + now - self._last
+        self._last = now
+
+    def add(self, phase: str, ns: int) -> None:
+        """Charge a duration measured elsewhere to phase."""
+        self.timings[phase] = self.timings.get(phase, 0) + ns
+
+    def snapshot(self) -> Dict[str, int]:
+        """Phase timings so far plus their sum as "total"."""
+        return dict(self.timings, total=sum(self.timings.values()))
+
+
+def append_metrics(record: dict, path: Optional[str] = METRICS_LOG) -> None:
+    """Append one turn's timings to the metrics JSONL (if CONTEXT_METRICS_LOG is set)."""
+    if not path:
+        return
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    try:
+        # One O_APPEND write per record, so concurrent instances don't interleave lines
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # Never fail the hook over metrics
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of a sorted list (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Relationship Index - which source files and keywords each doc is about
+
+For every .md doc under a docs root, the source files it describes (paths in
+backticks, **Location**: lines) and the keywords of its "## Keywords"
+section, as used by usage_tracker.py to infer which injected docs a turn's
+tool calls relied on.
+
+Stored at <docs_root>/.cache/relationships.json and loaded with one read.
+Docs are enumerated from the docs manifest (no recursive walk), and only
+docs whose (mtime_ns, size) changed are re-read. The reverse maps (source
+file -> docs, keyword -> docs) are derived in memory on first lookup.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from docs_manifest import CACHE_DIRNAME, get_docs_manifest
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+RELATIONSHIP_INDEX_VERSION = 1
+RELATIONSHIP_INDEX_FILENAME = "relationships.json"
+
+# `filename.py`, `path/to/file.ts`, ...
+_FILE_REF_RE = re.compile(r'`([a-zA-Z0-9_/.-]+\.[a-zA-Z]+)`')
+_LOCATION_RE = re.compile(r'\*\*Location\*\*:\s*`([^`]+)`')
+_KEYWORD_SECTION_RE = re.compile(r'## (?:Auto-Generated )?Keywords?\s*\n([^\n#]+)')
+
+
+def extract_relationships(content: str) -> Tuple[List[str], List[str]]:
+    """(source files described, keywords) of a doc's text."""
+    file_refs = _FILE_REF_RE.findall(content)
+    location_refs = _LOCATION_RE.findall(content)
+
+    keywords = []
+    keyword_section = _KEYWORD_SECTION_RE.search(content)
+    if keyword_section:
+        keywords = [k.strip() for k in re.split(r'[,\s]+', keyword_section.group(1)) if k.strip()]
+
+    return sorted(set(file_refs + location_refs)), keywords
+
+
+def _path_suffixes(target: str) -> List[str]:
+    """'/a/b/c.py' -> ['/a/b/c.py', 'a/b/c.py', 'b/c.py', 'c.py'] (whole path components)."""
+    parts = target.replace("\\", "/").split("/")
+    return [suffix for suffix in ("/".join(parts[i:]) for i in range(len(parts))) if suffix]
+
+
+class RelationshipIndex:
+    """Per-docs-root doc relationships, persisted and validated per doc."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.path = root / CACHE_DIRNAME / RELATIONSHIP_INDEX_FILENAME
+        self.docs: Dict[str, list] = {}   # rel doc path -> [mtime_ns, size, describes, keywords]
+        self._by_source: Optional[Dict[str, Set[str]]] = None
+        self._by_keyword: Optional[Dict[str, Set[str]]] = None
+        self._dirty = False
+
+    @classmethod
+    def load(cls, root: Path) -> "RelationshipIndex":
+        """Load the persisted index (empty if missing, stale or corrupt)."""
+        index = cls(root)
+        try:
+            data = json.loads(index.path.read_text())
+            if data.get("version") == RELATIONSHIP_INDEX_VERSION and data.get("root") == str(root):
+                index.docs = data["docs"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return index
+
+    def save(self) -> None:
+        """Atomically persist the index if any doc was re-read."""
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({
+                "version": RELATIONSHIP_INDEX_VERSION,
+                "root": str(self.root),
+                "docs": self.docs,
+            }))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            pass  # Read-only docs root: index still works in memory
+
+    def refresh(self) -> bool:
+        """
+        Sync with the docs manifest, re-reading only new or changed docs.
+        Returns True if anything changed.
+        """
+        manifest = get_docs_manifest(self.root)
+        changed = False
+        for doc in [d for d in self.docs if d not in manifest]:
+            del self.docs[doc]
+            changed = True
+
+        for doc in manifest.docs:
+            try:
+                st = os.stat(self.root / doc)
+            except OSError:
+                continue
+            cached = self.docs.get(doc)
+            if cached and (cached[0], cached[1]) == (st.st_mtime_ns, st.st_size):
+                continue
+            try:
+                describes, keywords = extract_relationships((self.root / doc).read_text())
+            except (OSError, UnicodeError):
+                self.docs.pop(doc, None)
+                continue
+            self.docs[doc] = [st.st_mtime_ns, st.st_size, describes, keywords]
+            changed = True
+
+        if changed:
+            self._dirty = True
+            self._by_source = self._by_keyword = None
+        return changed
+
+    # ------------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------------
+
+    def relationships(self) -> Dict[str, Dict[str, List[str]]]:
+        """{doc: {'describes': [...], 'keywords': [...]}} for every doc."""
+        return {doc: {'describes': e[2], 'keywords': e[3]} for doc, e in self.docs.items()}
+
+    def _build_reverse(self) -> None:
+        self._by_source, self._by_keyword = {}, {}
+        for doc, (_, _, describes, keywords) in self.docs.items():
+            for source in describes:
+                source = source[2:] if source.startswith("./") else source
+                self._by_source.setdefault(source, set()).add(doc)
+            for keyword in keywords:
+                self._by_keyword.setdefault(keyword.lower(), set()).add(doc)
+
+    def docs_describing(self, target: str) -> Set[str]:
+        """Docs describing a source file: any that name a whole-component suffix of its path."""
+        if self._by_source is None:
+            self._build_reverse()
+        docs: Set[str] = set()
+        for suffix in _path_suffixes(target):
+            docs.update(self._by_source.get(suffix, ()))
+        return docs
+
+    def docs_matching(self, pattern: str) -> Set[str]:
+        """Docs with a keyword occurring in a search pattern."""
+        if self._by_keyword is None:
+            self._build_reverse()
+        pattern = pattern.lower()
+        docs: Set[str] = set()
+        for keyword, keyword_docs in self._by_keyword.items():
+            if keyword in pattern:
+                docs.update(keyword_docs)
+        return docs
+
+
+# Indexes by root (persist across calls within a process)
+_INDEXES: Dict[Path, RelationshipIndex] = {}
+
+
+def get_relationship_index(root: Path) -> RelationshipIndex:
+    """Load (once per process), refresh and save the relationship index for a docs root."""
+    index = _INDEXES.get(root)
+    if index is None:
+        index = _INDEXES[root] = RelationshipIndex.load(root)
+    index.refresh()
+    index.save()
+    return index
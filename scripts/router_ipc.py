@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Router IPC - Unix socket protocol for the context router daemon
+
+Shared by the long-lived router (`context-router-v2.py --serve`) and the thin
+UserPromptSubmit client (`context-router-client.py`). Kept free of router
+imports so the client stays cheap to start.
+
+Wire format: 4-byte big-endian length prefix + UTF-8 JSON body, one request
+and one reply per connection.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import struct
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SOCKET_ENV = "CONTEXT_ROUTER_SOCKET"  # Explicit socket path override
+CONNECT_TIMEOUT = 0.05                # Seconds; a live daemon accepts instantly
+REPLY_TIMEOUT = 5.0                   # Seconds to wait for a routed reply
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024  # Refuse absurd frames
+
+# Environment forwarded from the hook to the daemon with every request
+FORWARDED_ENV = ["CLAUDE_INSTANCE", "CONTEXT_DOCS_ROOT"]
+
+_HEADER = struct.Struct(">I")
+
+
+def get_socket_path(project_dir: Optional[Path] = None) -> Path:
+    """
+    Per-project socket path.
+
+    Derived from a hash of the project directory so it stays well under the
+    AF_UNIX path limit regardless of how deep the project lives.
+    """
+    if env_path := os.getenv(SOCKET_ENV):
+        return Path(env_path).expanduser()
+
+    project = str((project_dir or Path.cwd()).resolve())
+    digest = hashlib.sha1(project.encode()).hexdigest()[:12]
+    base = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(base) / f"claude-router-{os.getuid()}-{digest}.sock"
+
+
+# ============================================================================
+# FRAMING
+# ============================================================================
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 65536))
+        if not chunk:
+            raise ConnectionError("socket closed mid-message")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def write_message(sock: socket.socket, message: dict) -> None:
+    """Send one length-prefixed JSON message."""
+    body = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def read_message(sock: socket.socket) -> dict:
+    """Receive one length-prefixed JSON message."""
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f"message too large: {size} bytes")
+    return json.loads(_recv_exact(sock, size).decode("utf-8"))
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+def build_request(raw_input: str) -> dict:
+    """Wrap raw hook stdin with the context the daemon needs to validate it."""
+    return {
+        "input": raw_input,
+        "cwd": os.getcwd(),
+        "env": {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ},
+    }
+
+
+def send_request(request: dict, socket_path: Optional[Path] = None) -> Optional[dict]:
+    """
+    Send a request to the daemon and return its reply.
+
+    Returns None when no daemon is listening or the exchange fails, so callers
+    can fall back to the in-process router.
+    """
+    path = socket_path or get_socket_path()
+    if not path.exists():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(path))
+            sock.settimeout(REPLY_TIMEOUT)
+            write_message(sock, request)
+            return read_message(sock)
+    except (OSError, ValueError, ConnectionError):
+        return None
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+State Store - compact binary persistence for attention state
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header      magic "CCAS", version u16, reserved u16, turn_count i64,
+                last_update f64 (epoch seconds), entries u32, path bytes u32
+    scores      f64[entries]   decayed score at turn_count
+    touch       f64[entries]   score at touch
+    turns       i64[entries]   touched turn
+    path_ends   u32[entries]   end offset of each path in the path table
+    paths       utf-8, concatenated (interned path table)
+
+Section-level attention (chunked mode) is stored in the same table, one
+entry per "<path>\x1f<section anchor>" with a 0 score column; readers split
+it back out as state["sections"].
+
+Writes go to a temp file and are swapped in with os.replace, so readers
+never see a torn file. Reads mmap the file; the numeric sections are
+memoryviews into the mapping, not copies.
+
+Each instance (CLAUDE_INSTANCE, else hook session) owns one shard,
+<state dir>/attn_state/<instance>.bin, written only by that instance.
+merge_states() joins shards into a project-wide view: per file the highest
+decayed score and the latest update that held it. The join is commutative
+and idempotent, so readers can merge shards in any order.
+
+Usage: python3 state_store.py [STATE_FILE | STATE_DIR]   (dump as JSON;
+       a directory dumps the merged view of its shards)
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+STATE_MAGIC = b"CCAS"
+STATE_VERSION = 1
+STATE_FILENAME = "attn_state.bin"
+LEGACY_STATE_FILENAME = "attn_state.json"
+SHARD_DIRNAME = "attn_state"
+SHARD_MAX_AGE_DAYS = 14     # Shards untouched this long are removed by prune_shards()
+SECTION_SEP = "\x1f"        # Separates path and section anchor in section entries
+
+_HEADER = struct.Struct("<4sHHqdII")   # 32 bytes
+
+
+def _pad8(n: int) -> int:
+    return -n % 8
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+class StateSnapshot:
+    """
+    Read-only view of a state file.
+
+    scores / touch_scores / touch_turns are memoryviews into the mmap;
+    call close() (or use as a context manager) to release the mapping.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: List[memoryview] = [memoryview(self._map)]
+        try:
+            self._parse(self._views[0])
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self, view: memoryview) -> None:
+        if len(view) < _HEADER.size:
+            raise ValueError("truncated state header")
+        magic, version, _, turn_count, last_update, n, path_bytes = _HEADER.unpack_from(view)
+        if magic != STATE_MAGIC or version != STATE_VERSION:
+            raise ValueError("not a state file (or unsupported version)")
+
+        offset = _HEADER.size
+        end = offset + n * (8 + 8 + 8 + 4) + _pad8(n * 4) + path_bytes
+        if len(view) < end:
+            raise ValueError("truncated state file")
+
+        self.turn_count = turn_count
+        self.last_update = last_update
+
+        def section(fmt: str, size: int) -> memoryview:
+            nonlocal offset
+            part = view[offset:offset + n * size].cast(fmt)
+            offset += n * size + _pad8(n * size)
+            self._views.append(part)
+            return part
+
+        self.scores = section("d", 8)
+        self.touch_scores = section("d", 8)
+        self.touch_turns = section("q", 8)
+        path_ends = section("I", 4)
+
+        blob = view[offset:offset + path_bytes]
+        self.paths: List[str] = []
+        start = 0
+        for stop in path_ends:
+            self.paths.append(str(blob[start:stop], "utf-8"))
+            start = stop
+        blob.release()
+
+    def to_state(self) -> dict:
+        """Materialize as the router's state dict."""
+        touch, scores, sections = {}, {}, {}
+        for path, score, touch_score, turn in zip(self.paths, self.scores, self.touch_scores, self.touch_turns):
+            if SECTION_SEP in path:
+                sections[path] = [touch_score, turn]
+            else:
+                touch[path] = [touch_score, turn]
+                scores[path] = score
+        return {
+            "touch": touch,
+            "scores": scores,
+            "sections": sections,
+            "turn_count": self.turn_count,
+            "last_update": datetime.fromtimestamp(self.last_update).isoformat(),
+        }
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def __enter__(self) -> "StateSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_state(path: Path) -> Optional[dict]:
+    """State dict from a binary state file, or None if missing or corrupt."""
+    try:
+        with StateSnapshot(path) as snapshot:
+            return snapshot.to_state()
+    except (OSError, ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+
+def read_legacy_state(path: Path) -> Optional[dict]:
+    """State dict from a pre-binary attn_state.json, or None."""
+    try:
+        state = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+# ============================================================================
+# WRITING
+# ============================================================================
+
+def encode_state(state: dict) -> bytes:
+    """Serialize a state dict (touch + sections + scores + turn_count) to the binary layout."""
+    touch: Dict[str, List[float]] = dict(state.get("touch", {}))
+    touch.update(state.get("sections", {}))
+    scores: Dict[str, float] = state.get("scores", {})
+    paths = list(touch)
+
+    encoded = [p.encode("utf-8") for p in paths]
+    path_ends = array("I")
+    total = 0
+    for raw in encoded:
+        total += len(raw)
+        path_ends.append(total)
+
+    try:
+        last_update = datetime.fromisoformat(state["last_update"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        last_update = datetime.now().timestamp()
+
+    n = len(paths)
+    parts = [
+        _HEADER.pack(STATE_MAGIC, STATE_VERSION, 0, state.get("turn_count", 0), last_update, n, total),
+        array("d", (scores.get(p, 0.0) for p in paths)).tobytes(),
+        array("d", (touch[p][0] for p in paths)).tobytes(),
+        array("q", (int(touch[p][1]) for p in paths)).tobytes(),
+        path_ends.tobytes(),
+        b"\0" * _pad8(n * 4),
+        b"".join(encoded),
+    ]
+    return b"".join(parts)
+
+
+def write_state(path: Path, state: dict) -> None:
+    """Atomically write a state file (temp file, then os.replace)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(encode_state(state))
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+# ============================================================================
+# PER-INSTANCE SHARDS
+# ============================================================================
+
+def get_shard_path(state_dir: Path, instance_id: str) -> Path:
+    """Shard file for an instance (ID sanitized for use as a filename)."""
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", instance_id)[:64] or "default"
+    return state_dir / SHARD_DIRNAME / f"{safe}.bin"
+
+
+def list_shards(state_dir: Path) -> List[Path]:
+    """All shard files under a state directory."""
+    try:
+        return sorted((state_dir / SHARD_DIRNAME).glob("*.bin"))
+    except OSError:
+        return []
+
+
+def prune_shards(state_dir: Path, max_age_days: float = SHARD_MAX_AGE_DAYS) -> None:
+    """Remove shards of instances that haven't routed a prompt in max_age_days."""
+    cutoff = time.time() - max_age_days * 86400
+    for shard in list_shards(state_dir):
+        try:
+            if shard.stat().st_mtime < cutoff:
+                shard.unlink()
+        except OSError:
+            pass
+
+
+def merge_states(states: Iterable[dict]) -> dict:
+    """
+    Project-wide view of several shard states.
+
+    scores: per file, the highest decayed score across shards
+    touched_at: per file, the latest last_update of a shard tracking it
+    """
+    merged = {"scores": {}, "touched_at": {}, "turn_count": 0, "last_update": None, "instances": 0}
+    scores, touched_at = merged["scores"], merged["touched_at"]
+    for state in states:
+        merged["instances"] += 1
+        merged["turn_count"] = max(merged["turn_count"], state.get("turn_count", 0))
+        updated = state.get("last_update") or ""
+        if merged["last_update"] is None or updated > merged["last_update"]:
+            merged["last_update"] = updated
+        for path, score in state.get("scores", {}).items():
+            if score > scores.get(path, -1.0):
+                scores[path] = score
+            if updated > touched_at.get(path, ""):
+                touched_at[path] = updated
+    return merged
+
+
+def read_merged_state(state_dir: Path) -> Optional[dict]:
+    """
+    Merged view of every shard under state_dir, falling back to a
+    pre-shard attn_state.bin / attn_state.json. None if there is no state.
+    """
+    states = [s for s in (read_state(p) for p in list_shards(state_dir)) if s is not None]
+    if not states:
+        legacy = read_state(state_dir / STATE_FILENAME) or read_legacy_state(state_dir / LEGACY_STATE_FILENAME)
+        if legacy is None:
+            return None
+        states = [legacy]
+    return merge_states(states)
+
+
+def read_latest_state(state_dir: Path) -> Optional[dict]:
+    """
+    State of the most recently written shard under state_dir, falling back
+    to a pre-shard attn_state.bin / attn_state.json. None if there is no state.
+    """
+    shards = []
+    for shard in list_shards(state_dir):
+        try:
+            shards.append((shard.stat().st_mtime_ns, shard))
+        except OSError:
+            continue
+    for _, shard in sorted(shards, reverse=True):
+        state = read_state(shard)
+        if state is not None:
+            return state
+    return read_state(state_dir / STATE_FILENAME) or read_legacy_state(state_dir / LEGACY_STATE_FILENAME)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(".claude")
+    state = read_merged_state(path) if path.is_dir() else read_state(path)
+    if state is None:
+        print(f"⚠ No readable state at {path}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(state, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Token Matcher - word-boundary keyword activation
+
+Prompts and keywords are normalized the same way (NFKC, casefold, split
+into word tokens, light suffix stemming), so "tier" matches "tiers" and
+"Tier" but not "frontier", and "t3" does not fire inside "gt3x".
+
+Single-token keywords are one hash lookup per prompt token; multi-token
+keywords ("auto-generate", "spreading activation") walk a trie keyed by
+token. Keywords with no word characters fall back to substring matching.
+
+Same interface as KeywordMatcher (keyword_matcher.py), which keywords.json
+can still select with "matching": "substring".
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Set
+
+_WORD_RE = re.compile(r"\w+")
+_END = ""   # Trie key holding the pattern ids that end at a node (never a token)
+
+
+def stem(token: str) -> str:
+    """
+    Light suffix stripping (plurals, -ing, -ed). Short tokens and tokens
+    with digits (codes like "t3", "l0", "v2") are left exact.
+    """
+    if len(token) <= 3 or not token.isalpha():
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("sses"):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    if token.endswith("ing") and len(token) >= 7:
+        return token[:-3]
+    if token.endswith("ed") and len(token) >= 6:
+        return token[:-2]
+    return token
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """NFKC-normalized, casefolded, stemmed word tokens of text."""
+    return [stem(t) for t in _WORD_RE.findall(unicodedata.normalize("NFKC", text).casefold())]
+
+
+def normalize_phrase(text: str) -> str:
+    """Tokens of text joined by single spaces (for word-boundary containment checks)."""
+    return " ".join(normalize_tokens(text))
+
+
+class TokenMatcher:
+    """Token set + phrase trie over all keywords of all files."""
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        """
+        Args:
+            keywords: {file_path: [keyword, ...]} as loaded from keywords.json
+        """
+        self.patterns: List[str] = []           # pattern id -> keyword
+        self.owners: List[List[str]] = []       # pattern id -> files owning it
+        self._single: Dict[str, List[int]] = {}  # token -> single-token pattern ids
+        self._phrases: Dict[str, dict] = {}     # first token -> trie node
+        self._substring: List[int] = []         # keywords without word tokens
+        self._always: List[int] = []            # empty keywords match every prompt
+
+        pattern_ids: Dict[str, int] = {}
+        for path, keyword_list in keywords.items():
+            for kw in keyword_list:
+                if kw not in pattern_ids:
+                    pattern_ids[kw] = len(self.patterns)
+                    self.patterns.append(kw)
+                    self.owners.append([])
+                    self._insert(kw, pattern_ids[kw])
+                owners = self.owners[pattern_ids[kw]]
+                if path not in owners:
+                    owners.append(path)
+
+    def _insert(self, keyword: str, pattern_id: int) -> None:
+        if not keyword:
+            self._always.append(pattern_id)
+            return
+        tokens = normalize_tokens(keyword)
+        if not tokens:
+            self._substring.append(pattern_id)
+        elif len(tokens) == 1:
+            self._single.setdefault(tokens[0], []).append(pattern_id)
+        else:
+            node = self._phrases.setdefault(tokens[0], {})
+            for token in tokens[1:]:
+                node = node.setdefault(token, {})
+            node.setdefault(_END, []).append(pattern_id)
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """
+        Returns:
+            {file_path: {keywords that fired}} for every activated file
+        """
+        tokens = normalize_tokens(text)
+        single, phrases = self._single, self._phrases
+
+        fired: Set[int] = set(self._always)
+        for i, token in enumerate(tokens):
+            ids = single.get(token)
+            if ids:
+                fired.update(ids)
+            node = phrases.get(token)
+            j = i + 1
+            while node is not None and j < len(tokens):
+                node = node.get(tokens[j])
+                j += 1
+                if node is not None and _END in node:
+                    fired.update(node[_END])
+
+        if self._substring:
+            folded = unicodedata.normalize("NFKC", text).casefold()
+            fired.update(p for p in self._substring if self.patterns[p].casefold() in folded)
+
+        matches: Dict[str, Set[str]] = {}
+        for pattern_id in fired:
+            keyword = self.patterns[pattern_id]
+            for path in self.owners[pattern_id]:
+                matches.setdefault(path, set()).add(keyword)
+        return matches
@@ -8,7 +8,14 @@ Analyzes:
 - Source files affected
 - Which .claude/*.md files were useful
 
-Feeds data to UsageTracker for learning.
+Feeds data to UsageTracker for learning: the injections the router queued
+for this session (by session_id from the hook input) are joined with the
+tool calls of the turn.
+
+Also does the router's between-turn upkeep off the prompt path: daily
+attention history compaction, and keeping the content index
+(CONTEXT_CONTENT_WEIGHT > 0) up to date when no router daemon is running (a
+daemon does this itself).
 """
 import json
 import sys
@@ -20,16 +27,47 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent))
 
 try:
-    from usage_tracker import UsageTracker
+    from usage_tracker import UsageTracker, prune_pending
     TRACKER_AVAILABLE = True
 except ImportError:
     TRACKER_AVAILABLE = False
 
+try:
+    from content_index import maintain_content_index
+    from docs_manifest import get_docs_manifest
+    from router_ipc import get_socket_path
+    CONTENT_INDEX_AVAILABLE = True
+except ImportError:
+    CONTENT_INDEX_AVAILABLE = False
+
+try:
+    from history_store import compact_if_due
+    HISTORY_STORE_AVAILABLE = True
+except ImportError:
+    HISTORY_STORE_AVAILABLE = False
+
 # Session environment
 SESSION_ENV = Path(os.environ.get("CLAUDE_SESSION_ENV", ""))
 
-def get_transcript_path():
-    """Get path to transcript.jsonl."""
+# Same switch as the router; 0 (default) means no content index to maintain
+CONTENT_WEIGHT = float(os.environ.get("CONTEXT_CONTENT_WEIGHT", "0") or 0)
+
+def read_hook_input():
+    """Parse the Stop hook's JSON from stdin ({} if absent or invalid)."""
+    try:
+        data = json.loads(sys.stdin.read() or "{}")
+    except (json.JSONDecodeError, OSError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def get_session_id(input_data):
+    """Same session key the router queues injections under."""
+    return input_data.get("session_id") or os.environ.get("CLAUDE_INSTANCE", "default")
+
+def get_transcript_path(input_data):
+    """Get path to transcript.jsonl (hook input first, then session env)."""
+    if input_data.get("transcript_path"):
+        return Path(input_data["transcript_path"])
     if SESSION_ENV and SESSION_ENV.exists():
         return SESSION_ENV / "transcript.jsonl"
     return None
@@ -127,36 +165,63 @@ def get_last_response_text(transcript_path):
 
     return ""
 
+def get_docs_root():
+    """Docs root the router uses (CONTEXT_DOCS_ROOT, project .claude/, ~/.claude/)."""
+    if os.environ.get("CONTEXT_DOCS_ROOT"):
+        return Path(os.environ["CONTEXT_DOCS_ROOT"]).expanduser().resolve()
+    project_claude = Path.cwd() / ".claude"
+    if project_claude.is_dir() and len(get_docs_manifest(project_claude)):
+        return project_claude
+    return Path.home() / ".claude"
+
+def maintain_content():
+    """Edit detection and indexing for the content index between turns."""
+    if not CONTENT_INDEX_AVAILABLE or CONTENT_WEIGHT <= 0 or get_socket_path().exists():
+        return
+    docs_root = get_docs_root()
+    if docs_root.is_dir():
+        maintain_content_index(docs_root)
+
 def main():
     """Main entry point."""
+    try:
+        if HISTORY_STORE_AVAILABLE:
+            compact_if_due()
+        maintain_content()
+    except Exception as e:
+        log_error(e)
+
     if not TRACKER_AVAILABLE:
         return  # Silent fail if tracker not available
 
     try:
+        input_data = read_hook_input()
+
         # Initialize tracker
         tracker = UsageTracker(mode='observe')
 
-        # Get transcript path
-        transcript_path = get_transcript_path()
-        if not transcript_path:
+        # Injections the router queued for this session since the last Stop
+        if not tracker.load_pending_injections(get_session_id(input_data)):
+            prune_pending()
             return
 
-        # Extract tool calls from last response
+        # Extract tool calls and response text (mention detection) from the
+        # last response; a turn without them still counts as injected, unused
+        transcript_path = get_transcript_path(input_data)
         tool_calls = extract_tool_calls(transcript_path)
-
-        # Get response text for mention detection
         response_text = get_last_response_text(transcript_path)
 
-        # Track usage if we have data
-        if tool_calls or response_text:
-            tracker.track_turn_usage(tool_calls, response_text)
+        tracker.track_turn_usage(tool_calls, response_text)
 
     except Exception as e:
         # Silent failure - don't block conversation
-        error_log = Path.home() / ".claude/usage_tracking_errors.log"
-        error_log.parent.mkdir(parents=True, exist_ok=True)
-        with open(error_log, "a") as f:
-            f.write(f"[{datetime.now().isoformat()}] {e}\n")
+        log_error(e)
+
+def log_error(e):
+    error_log = Path.home() / ".claude/usage_tracking_errors.log"
+    error_log.parent.mkdir(parents=True, exist_ok=True)
+    with open(error_log, "a") as f:
+        f.write(f"[{datetime.now().isoformat()}] {e}\n")
 
 if __name__ == "__main__":
     main()
@@ -11,12 +11,16 @@ Part of claude-cognitive v1.2 Phase 1.
 """
 
 import json
+import os
 import re
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
 from collections import defaultdict
 
+from relationship_index import extract_relationships, get_relationship_index
+from usefulness import write_summary
+
 
 # ============================================================================
 # CONFIGURATION
@@ -35,6 +39,98 @@ GLOBAL_WEIGHTS = Path.home() / ".claude/keyword_weights.json"
 PROJECT_PROGRESS = Path(".claude/learning_progress.txt")
 GLOBAL_PROGRESS = Path.home() / ".claude/learning_progress.txt"
 
+# Injection records queued by the router, one JSONL file per session,
+# consumed by the Stop hook (usage-track-stop.py)
+PROJECT_PENDING = Path(".claude/usage_pending")
+GLOBAL_PENDING = Path.home() / ".claude/usage_pending"
+PENDING_MAX_AGE_DAYS = 7   # Drop queues of sessions that never reached a Stop hook
+
+
+# ============================================================================
+# INJECTION QUEUE
+# ============================================================================
+
+def get_pending_dir() -> Path:
+    """Injection queue directory (project-local preferred, like the other state files)."""
+    return PROJECT_PENDING if PROJECT_PENDING.parent.exists() else GLOBAL_PENDING
+
+
+def _pending_file(pending_dir: Path, session_id: str) -> Path:
+    return pending_dir / (re.sub(r"[^\w.-]", "_", session_id) + ".jsonl")
+
+
+def queue_injection(record: Dict, pending_dir: Optional[Path] = None) -> None:
+    """
+    Queue one turn's injection record for the Stop hook.
+
+    Called on the prompt path, so it is a single O_APPEND write; records
+    are joined with the turn's tool calls later, by session ID.
+
+    Args:
+        record: {'session_id': ..., 'turn': router turn, 'timestamp': ...,
+                 'injected_files': [{'file', 'tier', 'score', 'chars'}, ...]}
+    """
+    pending_dir = pending_dir or get_pending_dir()
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    try:
+        pending_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(_pending_file(pending_dir, record["session_id"]), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # Never fail the prompt hook over usage tracking
+
+
+def claim_pending_injections(session_id: str, pending_dir: Optional[Path] = None) -> List[Dict]:
+    """
+    Take all queued injection records of a session, oldest first.
+
+    The session's queue is renamed away before reading, so records the
+    router appends meanwhile start a new queue instead of being lost.
+    """
+    pending_dir = pending_dir or get_pending_dir()
+    queue_file = _pending_file(pending_dir, session_id)
+    claimed = queue_file.with_name(f"{queue_file.name}.{os.getpid()}.claimed")
+    try:
+        os.replace(queue_file, claimed)
+    except OSError:
+        return []
+
+    records = []
+    try:
+        with open(claimed) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # Torn line from a crashed writer
+    except OSError:
+        pass
+    finally:
+        try:
+            claimed.unlink()
+        except OSError:
+            pass
+    return records
+
+
+def prune_pending(pending_dir: Optional[Path] = None, max_age_days: int = PENDING_MAX_AGE_DAYS) -> None:
+    """Remove queues (and leftover claims) untouched for max_age_days."""
+    pending_dir = pending_dir or get_pending_dir()
+    cutoff = datetime.now().timestamp() - max_age_days * 86400
+    try:
+        entries = list(os.scandir(pending_dir))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
 
 # ============================================================================
 # FILE RELATIONSHIPS
@@ -53,32 +149,17 @@ def extract_file_relationships(md_file: Path) -> Dict[str, any]:
     if not md_file.exists():
         return {'describes': [], 'keywords': []}
 
-    content = md_file.read_text()
-
-    # Find file references in backticks or code blocks
-    # Matches: `filename.py`, `path/to/file.ts`, etc.
-    file_refs = re.findall(r'`([a-zA-Z0-9_/.-]+\.[a-zA-Z]+)`', content)
-
-    # Find file references in **Location**: lines
-    location_refs = re.findall(r'\*\*Location\*\*:\s*`([^`]+)`', content)
-
-    # Extract keywords from headers (## Keywords section if exists)
-    keywords = []
-    keyword_section = re.search(r'## (?:Auto-Generated )?Keywords?\s*\n([^\n#]+)', content)
-    if keyword_section:
-        keyword_line = keyword_section.group(1)
-        keywords = [k.strip() for k in re.split(r'[,\s]+', keyword_line) if k.strip()]
-
-    return {
-        'describes': list(set(file_refs + location_refs)),
-        'keywords': keywords
-    }
+    describes, keywords = extract_relationships(md_file.read_text())
+    return {'describes': describes, 'keywords': keywords}
 
 
 def build_file_relationship_map(claude_dir: Path = Path(".claude")) -> Dict[str, Dict]:
     """
     Build map of .claude/*.md files → source files they describe.
 
+    Served from the persisted relationship index (relationship_index.py),
+    which re-reads only docs changed since the last call.
+
     Returns:
         {
             'modules/pipeline.md': {
@@ -87,14 +168,8 @@ def build_file_relationship_map(claude_dir: Path = Path(".claude")) -> Dict[str,
             }
         }
     """
-    relationships = {}
-
-    # Scan all .md files in .claude/
-    for md_file in claude_dir.rglob("*.md"):
-        rel_path = str(md_file.relative_to(claude_dir.parent))
-        relationships[rel_path] = extract_file_relationships(md_file)
-
-    return relationships
+    # Keyed like the router's doc paths, so accesses join with injections
+    return get_relationship_index(claude_dir.absolute()).relationships()
 
 
 # ============================================================================
@@ -120,11 +195,16 @@ class UsageTracker:
         # Load existing state
         self.stats = self._load_stats()
         self.weights = self._load_weights()
-        self.relationships = build_file_relationship_map()
+        self.relationship_index = get_relationship_index(Path(".claude").absolute())
 
         # Turn counter
         self.turn_count = self._get_turn_count()
 
+    @property
+    def relationships(self) -> Dict[str, Dict]:
+        """{doc: {'describes': [...], 'keywords': [...]}} (see build_file_relationship_map)."""
+        return self.relationship_index.relationships()
+
     def _get_state_file(self, project_path: Path, global_path: Path) -> Path:
         """Get appropriate state file (project-local preferred)."""
         if project_path.parent.exists():
@@ -169,12 +249,17 @@ class UsageTracker:
         return 0
 
     def _save_stats(self):
-        """Save usage statistics to file."""
-        self.stats_file.write_text(json.dumps(self.stats, indent=2))
+        """Save usage statistics (atomically) and refresh the router's usefulness summary."""
+        tmp_file = self.stats_file.with_name(f"{self.stats_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(self.stats, indent=2))
+        os.replace(tmp_file, self.stats_file)
+        write_summary(self.stats_file, self.stats)
 
     def _save_weights(self):
-        """Save keyword weights to file."""
-        self.weights_file.write_text(json.dumps(self.weights, indent=2))
+        """Save keyword weights to file (atomically: the router reads it every turn)."""
+        tmp_file = self.weights_file.with_name(f"{self.weights_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(self.weights, indent=2))
+        os.replace(tmp_file, self.weights_file)
 
     def _append_history(self, entry: Dict):
         """Append entry to history JSONL."""
@@ -191,7 +276,9 @@ class UsageTracker:
     # Injection tracking
     # ------------------------------------------------------------------------
 
-    def log_injection(self, injected_files: List[Dict], prompt: str):
+    def log_injection(self, injected_files: List[Dict], prompt: str, session_id: Optional[str] = None,
+                      router_turn: Optional[int] = None, timestamp: Optional[str] = None,
+                      save: bool = True):
         """
         Log which files were injected this turn.
 
@@ -201,13 +288,17 @@ class UsageTracker:
                 ...
             ]
             prompt: User's query text
+            session_id, router_turn, timestamp: from a queued router record
+            save: write stats now (False when logging a batch, saved once after)
         """
         self.turn_count += 1
 
         # Store for access tracking later
         self.current_turn = {
             'turn': self.turn_count,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'session_id': session_id,
+            'router_turn': router_turn,
             'injected_files': injected_files,
             'prompt': prompt,
             'files_accessed': [],  # Will be filled by track_turn_usage
@@ -230,7 +321,30 @@ class UsageTracker:
             self.stats[file]['injected_count'] += 1
             self.stats[file]['last_injected'] = self.current_turn['timestamp']
 
-        self._save_stats()
+        if save:
+            self._save_stats()
+
+    def load_pending_injections(self, session_id: str) -> bool:
+        """
+        Log the injections the router queued for a session since its last
+        Stop hook. The latest one becomes current_turn for track_turn_usage().
+
+        Returns:
+            True if any injection was pending
+        """
+        records = claim_pending_injections(session_id)
+        for record in records:
+            self.log_injection(
+                record.get('injected_files', []),
+                "",
+                session_id=record.get('session_id', session_id),
+                router_turn=record.get('turn'),
+                timestamp=record.get('timestamp'),
+                save=False,
+            )
+        if records:
+            self._save_stats()
+        return bool(records)
 
     # ------------------------------------------------------------------------
     # Access inference
@@ -261,20 +375,13 @@ class UsageTracker:
             # Direct file access (Read, Edit, Write)
             if target:
                 # Find which .md files describe this target file
-                for md_file, rel_info in self.relationships.items():
-                    for described_file in rel_info['describes']:
-                        # Match if target contains described file
-                        # e.g., scripts/context-router-v2.py matches context-router-v2.py
-                        if described_file in target or target.endswith(described_file):
-                            accessed_files.add(md_file)
+                # e.g., scripts/context-router-v2.py matches context-router-v2.py
+                accessed_files.update(self.relationship_index.docs_describing(target))
 
             # Pattern matching (Grep)
             if pattern:
                 # Find which .md files mention this pattern
-                for md_file, rel_info in self.relationships.items():
-                    for keyword in rel_info['keywords']:
-                        if keyword.lower() in pattern.lower():
-                            accessed_files.add(md_file)
+                accessed_files.update(self.relationship_index.docs_matching(pattern))
 
         return accessed_files
 
@@ -298,10 +405,7 @@ class UsageTracker:
             if tool_call.get('tool') in ['Edit', 'Write']:
                 target = tool_call.get('target', '')
                 # Find corresponding .md files
-                for md_file, rel_info in self.relationships.items():
-                    for described_file in rel_info['describes']:
-                        if described_file in target:
-                            edited_files.add(md_file)
+                edited_files.update(self.relationship_index.docs_describing(target))
 
         # Update statistics
         for file in accessed_files:
@@ -328,6 +432,8 @@ class UsageTracker:
         history_entry = {
             'turn': self.current_turn['turn'],
             'timestamp': self.current_turn['timestamp'],
+            'session_id': self.current_turn.get('session_id'),
+            'router_turn': self.current_turn.get('router_turn'),
             'injected': injected,
             'accessed': list(accessed_files),
             'edited': list(edited_files),
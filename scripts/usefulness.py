@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Usefulness - how often injected docs were actually used, for budget selection
+
+usage_tracker.py counts per doc how often it was injected, accessed, edited
+and mentioned (usage_stats.json). The router needs only two numbers per doc,
+so a compact summary {doc: [injected, usefulness]} is kept in
+.cache/usefulness.json next to the stats, keyed by the stats file's
+(mtime_ns, size). The tracker rewrites it whenever it saves stats; the
+router rebuilds it from the full stats file only if it is stale.
+
+Usefulness is smoothed toward PRIOR_USEFULNESS by PRIOR_INJECTIONS
+pseudo-injections, so a doc injected twice and never used is not treated
+like one injected fifty times, and docs without stats are neutral.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SUMMARY_VERSION = 1
+CACHE_DIRNAME = ".cache"
+SUMMARY_FILENAME = "usefulness.json"
+STATS_FILENAME = "usage_stats.json"
+
+PRIOR_USEFULNESS = 0.5      # Assumed usefulness of a doc without history
+PRIOR_INJECTIONS = 4        # Weight of the prior, in injections
+EDIT_BONUS = 0.5            # Same bonuses as UsageTracker.calculate_usefulness()
+MENTION_BONUS = 0.3
+MAX_FACTOR = 2.0            # Value multiplier of a doc that is always used
+DEMOTE_MIN_INJECTIONS = 10  # Never demote on less history than this
+DEMOTE_BELOW = 0.1          # Smoothed usefulness below which a doc drops one tier
+
+
+def smoothed_usefulness(stats: dict) -> float:
+    """Usefulness of one usage_stats.json entry, smoothed toward the prior."""
+    injected = stats.get("injected_count", 0)
+    used = (
+        stats.get("accessed_count", 0)
+        + EDIT_BONUS * stats.get("edited_count", 0)
+        + MENTION_BONUS * stats.get("mentioned_count", 0)
+    )
+    used = min(used, injected)
+    return (used + PRIOR_USEFULNESS * PRIOR_INJECTIONS) / (injected + PRIOR_INJECTIONS)
+
+
+def summarize(stats: Dict[str, dict]) -> Dict[str, list]:
+    """{doc: [injected_count, smoothed usefulness]} for docs injected at least once."""
+    return {
+        path: [entry.get("injected_count", 0), round(smoothed_usefulness(entry), 4)]
+        for path, entry in stats.items()
+        if isinstance(entry, dict) and entry.get("injected_count", 0) > 0
+    }
+
+
+def get_summary_path(stats_file: Path) -> Path:
+    """Summary location for a given usage_stats.json."""
+    return stats_file.parent / CACHE_DIRNAME / SUMMARY_FILENAME
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def write_summary(stats_file: Path, stats: Dict[str, dict]) -> Dict[str, list]:
+    """Atomically write the summary of stats just saved to stats_file."""
+    docs = summarize(stats)
+    summary_path = get_summary_path(stats_file)
+    try:
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = summary_path.with_name(f"{summary_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({
+            "version": SUMMARY_VERSION,
+            "stats": list(_signature(stats_file) or ()),
+            "docs": docs,
+        }, separators=(",", ":")))
+        os.replace(tmp_path, summary_path)
+    except OSError:
+        pass  # Summary is an optimization; the router rebuilds it if missing
+    return docs
+
+
+class UsefulnessPolicy:
+    """Per-doc value multipliers and demotions from a usefulness summary."""
+
+    def __init__(self, docs: Dict[str, list]):
+        self.docs = docs
+
+    def factor(self, path: str) -> float:
+        """Multiplier on a doc's selection value (1.0 without history)."""
+        entry = self.docs.get(path)
+        if entry is None:
+            return 1.0
+        return min(MAX_FACTOR, entry[1] / PRIOR_USEFULNESS)
+
+    def demoted(self, path: str) -> bool:
+        """True if the doc was injected often enough and almost never used."""
+        entry = self.docs.get(path)
+        return entry is not None and entry[0] >= DEMOTE_MIN_INJECTIONS and entry[1] < DEMOTE_BELOW
+
+
+def load_summary(stats_file: Path) -> Dict[str, list]:
+    """Summary for stats_file, rebuilt from the stats if missing or stale."""
+    signature = _signature(stats_file)
+    if signature is None:
+        return {}
+    try:
+        data = json.loads(get_summary_path(stats_file).read_text())
+        if data.get("version") == SUMMARY_VERSION and tuple(data.get("stats", ())) == signature:
+            return data["docs"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    try:
+        stats = json.loads(stats_file.read_text())
+    except (OSError, ValueError):
+        return {}
+    return write_summary(stats_file, stats) if isinstance(stats, dict) else {}
+
+
+# Policies by stats file, with the stats signature they were built from
+# (persist across turns under the router daemon)
+_POLICIES: Dict[Path, Tuple[Optional[Tuple[int, int]], UsefulnessPolicy]] = {}
+
+
+def get_usefulness_policy(docs_root: Path) -> UsefulnessPolicy:
+    """Usefulness policy for a docs root; one stat per call while the stats are unchanged."""
+    stats_file = docs_root / STATS_FILENAME
+    signature = _signature(stats_file)
+    cached = _POLICIES.get(stats_file)
+    if cached is None or cached[0] != signature:
+        cached = _POLICIES[stats_file] = (signature, UsefulnessPolicy(load_summary(stats_file)))
+    return cached[1]